@@ -5,6 +5,11 @@ import '../App.css';
 import 'bootstrap/dist/css/bootstrap.min.css';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
+// Frames are captured every FRAME_INTERVAL_MS and sent BURST_FRAMES at a time
+// to /predict_burst: ~13 fps, the rate the model's 40-frame training windows
+// were sampled at (3 s recordings), for ~4 requests per second.
+const FRAME_INTERVAL_MS = 75;
+const BURST_FRAMES = 3;
 
 function SignToText() {
   const [isServerConnected, setIsServerConnected] = useState(false);
@@ -21,6 +26,10 @@ function SignToText() {
   const animationFrameRef = useRef(null);
   const detectionIntervalRef = useRef(null);
   const isDetectingRef = useRef(false);
+  const retryAtRef = useRef(0); // server asked us to back off until this time (ms)
+  const sessionIdRef = useRef(Math.random().toString(36).slice(2)); // server keeps one frame buffer per session
+  const pendingFramesRef = useRef([]); // captured frames not yet sent, oldest first
+  const requestInFlightRef = useRef(false);
 
   // Initialize camera
   const startCamera = async () => {
@@ -83,21 +92,35 @@ function SignToText() {
       return;
     }
 
+    if (Date.now() < retryAtRef.current) {
+      console.log('Server busy, backing off');
+      return;
+    }
+
     console.log('Video readyState:', videoRef.current.readyState);
     
+    // Capture current frame
+    const frameData = captureFrame();
+    if (!frameData) {
+      console.log('No frame data captured');
+      return;
+    }
+    // While a burst is in flight keep only the newest frames for the next one
+    pendingFramesRef.current = [...pendingFramesRef.current, frameData].slice(-BURST_FRAMES);
+    if (pendingFramesRef.current.length < BURST_FRAMES || requestInFlightRef.current) {
+      return;
+    }
+    const frames = pendingFramesRef.current;
+    pendingFramesRef.current = [];
+    requestInFlightRef.current = true;
+    
     try {
-      // Capture current frame
-      const frameData = captureFrame();
-      if (!frameData) {
-        console.log('No frame data captured');
-        return;
-      }
-      
-      console.log('Sending frame to server...');
+      console.log(`Sending ${frames.length} frames to server...`);
       
       // Send to Flask API
-      const response = await axios.post(`${API_URL}/predict`, {
-        image: frameData
+      const response = await axios.post(`${API_URL}/predict_burst`, {
+        images: frames,
+        session_id: sessionIdRef.current
       });
       
       console.log('Server response received:', response.data);
@@ -155,6 +178,13 @@ function SignToText() {
       }
       
     } catch (err) {
+      if (err.response && err.response.status === 503) {
+        // Load shedding: skip frames for Retry-After seconds instead of piling up requests
+        const retryAfter = parseFloat(err.response.headers['retry-after']) || 1;
+        retryAtRef.current = Date.now() + retryAfter * 1000;
+        console.log(`Server busy (${err.response.data.reason}), retrying in ${retryAfter}s`);
+        return;
+      }
       console.error('Error during detection:', err);
       if (err.response) {
         console.error('Server error:', err.response.data);
@@ -166,6 +196,8 @@ function SignToText() {
       } else {
         setError(`Detection error: ${err.message}`);
       }
+    } finally {
+      requestInFlightRef.current = false;
     }
   };
 
@@ -183,12 +215,12 @@ function SignToText() {
     setLastDetectedSign('');
     await startCamera();
     
-    // Start detection loop (every 300ms for faster response)
+    // Start detection loop: capture every FRAME_INTERVAL_MS, send every BURST_FRAMES frames
     console.log('Setting up detection interval...');
+    pendingFramesRef.current = [];
     detectionIntervalRef.current = setInterval(() => {
-      console.log('Calling detectSign...');
       detectSign();
-    }, 300);
+    }, FRAME_INTERVAL_MS);
   };
 
   // Stop detection
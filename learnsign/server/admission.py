@@ -0,0 +1,123 @@
+import time
+import threading
+from functools import wraps
+
+from flask import jsonify, request
+
+
+def request_arrival(headers):
+    """
+    time.monotonic() at which the request reached the front proxy, from its
+    X-Request-Start header (Heroku: epoch ms; nginx: "t=<epoch s>"), so time
+    spent in the router and gunicorn backlog counts. Now if there is no header.
+    """
+    now = time.monotonic()
+    value = headers.get('X-Request-Start', '').strip()
+    if value.startswith('t='):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return now
+    # Normalize epoch seconds / ms / us to seconds
+    while started > 1e11:
+        started /= 1000
+    age = time.time() - started
+    return now - max(age, 0.0)
+
+
+class AdmissionController:
+    """
+    Bounded in-flight queue for one worker process.
+
+    At most `max_inflight` requests run at once and at most `max_queue` wait
+    for a slot. A request that finds the queue full, or waits longer than
+    `max_wait_s`, is shed with a fast 503 instead of queueing until the
+    gunicorn timeout. A request older than `stale_after_s` (the latency
+    budget, counted from its arrival, see request_arrival) is dropped as
+    well, on arrival or once it gets a slot: its frame is too old to be
+    worth a prediction by the time it would be processed.
+    """
+
+    def __init__(self, max_inflight=1, max_queue=4, max_wait_s=0.25, stale_after_s=0.5, retry_after_s=1):
+        if stale_after_s <= max_wait_s:
+            # Otherwise a request could wait its full max_wait_s and still be dropped as stale
+            raise ValueError(f"stale_after_s ({stale_after_s}) must exceed max_wait_s ({max_wait_s})")
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.stale_after_s = stale_after_s
+        self.retry_after_s = retry_after_s
+
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.inflight = 0
+        self.counts = {'admitted': 0, 'shed_queue_full': 0, 'shed_timeout': 0, 'dropped_stale': 0}
+
+    def acquire(self, arrived_at=None):
+        """
+        Returns None when admitted, otherwise the reason the request was
+        rejected. `arrived_at` is a time.monotonic() value (default: now).
+        """
+        if arrived_at is None:
+            arrived_at = time.monotonic()
+        with self._lock:
+            if time.monotonic() - arrived_at > self.stale_after_s:
+                self.counts['dropped_stale'] += 1
+                return 'stale'
+            if self.waiting >= self.max_queue:
+                self.counts['shed_queue_full'] += 1
+                return 'queue_full'
+            self.waiting += 1
+
+        got_slot = self._slots.acquire(timeout=self.max_wait_s)
+        age = time.monotonic() - arrived_at
+
+        with self._lock:
+            self.waiting -= 1
+            if not got_slot:
+                self.counts['shed_timeout'] += 1
+                return 'timeout'
+            if age > self.stale_after_s:
+                self.counts['dropped_stale'] += 1
+                self._slots.release()
+                return 'stale'
+            self.inflight += 1
+            self.counts['admitted'] += 1
+        return None
+
+    def release(self):
+        with self._lock:
+            self.inflight -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': self.inflight,
+                'queue_depth': self.waiting,
+                'max_inflight': self.max_inflight,
+                'max_queue': self.max_queue,
+                **self.counts,
+            }
+
+    def limit(self, view):
+        """Decorator for Flask views: 503 + Retry-After when the request is not admitted."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            reason = self.acquire(request_arrival(request.headers))
+            if reason is not None:
+                response = jsonify({
+                    'success': False,
+                    'error': 'Server busy, retry later',
+                    'reason': reason,
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(self.retry_after_s)
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                self.release()
+        return wrapper
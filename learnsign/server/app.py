@@ -2,29 +2,75 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import torch
 import torch.nn as nn
-from PIL import Image
-import io
+import os
 import base64
+import hmac
+import atexit
 import json
+import time
 import numpy as np
-import cv2
-import mediapipe as mp
+
+from admission import AdmissionController
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+from sessions import SessionStore, prepare_window, MIN_FRAMES
+from profiling import SamplingProfiler
+from image_decode import decode_rgb
+from hands_pool import HandsPool
+from session_log import SessionLog
+from hand_features import landmarks_to_array, FEATURES
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+CORS(app, expose_headers=['Retry-After'])  # Enable CORS for React frontend
+
+# MediaPipe Hands graphs landmarking concurrently within this process
+HANDS_POOL_SIZE = int(os.environ.get('HANDS_POOL_SIZE', 2))
 
-# Load class names
-with open('../client/src/Assets/class_names.json', 'r') as f:
-    class_names = json.load(f)
+# Admission control: per-worker bound on in-flight and waiting requests, so a
+# saturated worker answers 503 + Retry-After at once instead of queueing stale frames
+admission = AdmissionController(
+    max_inflight=int(os.environ.get('ADMISSION_MAX_INFLIGHT', HANDS_POOL_SIZE)),
+    max_queue=int(os.environ.get('ADMISSION_MAX_QUEUE', 4)),
+    max_wait_s=float(os.environ.get('ADMISSION_MAX_WAIT_MS', 250)) / 1000,
+    stale_after_s=float(os.environ.get('LATENCY_BUDGET_MS', 500)) / 1000,
+    retry_after_s=int(os.environ.get('RETRY_AFTER_S', 1)),
+)
 
-# Load the model
-MODEL_PATH = '../client/src/Assets/sign_model_mobile.pt'
+# Models: several vocabularies / versions from MODEL_REGISTRY (see models.example.json),
+# or the single MODEL_PATH + CLASS_NAMES_PATH model. Loaded lazily, LRU-bounded by memory.
+MODEL_PATH = os.environ.get('MODEL_PATH', '../client/src/Assets/sign_model_mobile.pt')
+CLASS_NAMES_PATH = os.environ.get('CLASS_NAMES_PATH', '../client/src/Assets/class_names.json')
+MODEL_REGISTRY = os.environ.get('MODEL_REGISTRY', 'models.json')
 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-model = None
+registry_options = dict(max_bytes=int(os.environ.get('MODEL_CACHE_MAX_MB', 512)) * 1024 ** 2, device=device)
+if os.path.exists(MODEL_REGISTRY):
+    registry = ModelRegistry.from_file(MODEL_REGISTRY, **registry_options)
+else:
+    registry = ModelRegistry([{'name': 'default', 'version': '1', 'path': MODEL_PATH,
+                               'class_names': CLASS_NAMES_PATH}], **registry_options)
+
+# Memoized predictions for near-identical normalized windows (hands held still)
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 1024)),
+    tolerance=float(os.environ.get('PREDICTION_CACHE_TOLERANCE', 0.01)),
+)
+
+# Opt-in sampling profiler for /api/predict (cProfile + torch.profiler -> PROFILE_DIR).
+# The rate can also be changed at runtime through /api/admin/profile with ADMIN_TOKEN.
+profiler = SamplingProfiler(
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    out_dir=os.environ.get('PROFILE_DIR', 'profiles'),
+    flush_every=int(os.environ.get('PROFILE_FLUSH_EVERY', 20)),
+    max_bytes=int(os.environ.get('PROFILE_MAX_MB', 100)) * 1024 ** 2,
+)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Frames whose longest side is >= 2x this are decoded at 1/2, 1/4 or 1/8 scale
+DECODE_TARGET_SIDE = int(os.environ.get('DECODE_TARGET_SIDE', 640))
 
-# MediaPipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
+# MediaPipe Hands (a graph is not thread-safe, so requests borrow one from the pool)
+hands_pool = HandsPool(
+    HANDS_POOL_SIZE,
     static_image_mode=True,
     max_num_hands=2,
     min_detection_confidence=0.5
@@ -32,112 +78,126 @@ hands = mp_hands.Hands(
 
 # Parameters from training
 SEQ_LEN = 40
-INPUT_SIZE = 126  # 21 landmarks * 3 coords * 2 hands
+# Most frames one /api/predict_burst request may carry
+BURST_MAX_FRAMES = int(os.environ.get('BURST_MAX_FRAMES', SEQ_LEN))
 
-# Buffer to store keypoint sequences
-keypoint_buffer = []
+# Keypoint sequence buffers, one per client session_id
+sessions = SessionStore(
+    SEQ_LEN,
+    max_sessions=int(os.environ.get('MAX_SESSIONS', 256)),
+    ttl_s=float(os.environ.get('SESSION_TTL_S', 300)),
+)
+# Opt-in record of every session's keypoint stream, for replay_sessions.py
+SESSION_LOG_DIR = os.environ.get('SESSION_LOG_DIR', '')
+session_log = None
+if SESSION_LOG_DIR:
+    session_log = SessionLog(
+        SESSION_LOG_DIR,
+        max_bytes=int(os.environ.get('SESSION_LOG_MAX_MB', 64)) * 1024 ** 2,
+        keep=int(os.environ.get('SESSION_LOG_KEEP', 10)),
+    )
+    atexit.register(session_log.close)
 
-def normalize_landmarks(seq):
-    """Normalize landmarks relative to bounding box for each frame."""
-    normalized = np.zeros_like(seq)
-    
-    for t in range(seq.shape[0]):
-        frame = seq[t].reshape(2, 21, 3)  # (2 hands, 21 landmarks, 3 coords)
-        
-        for hand_idx in range(2):
-            hand = frame[hand_idx]  # (21, 3)
-            
-            if np.sum(np.abs(hand)) > 0:
-                xs = hand[:, 0]
-                ys = hand[:, 1]
-                
-                min_x, max_x = xs.min(), xs.max()
-                min_y, max_y = ys.min(), ys.max()
-                
-                range_x = max_x - min_x
-                range_y = max_y - min_y
-                
-                if range_x > 0:
-                    hand[:, 0] = (xs - min_x) / range_x
-                if range_y > 0:
-                    hand[:, 1] = (ys - min_y) / range_y
-                
-                frame[hand_idx] = hand
-        
-        normalized[t] = frame.reshape(126)
-    
-    return normalized
+def decode_image(image_data):
+    """Base64 image (optionally a data URL) -> RGB uint8; large JPEGs are decoded at reduced scale."""
+    # Remove data URL prefix if present
+    if ',' in image_data:
+        image_data = image_data.split(',')[1]
+    return decode_rgb(base64.b64decode(image_data), DECODE_TARGET_SIDE)
 
-def extract_keypoints(image):
-    """Extract hand keypoints from image using MediaPipe."""
-    # Convert PIL to CV2
-    image_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-    results = hands.process(cv2.cvtColor(image_cv, cv2.COLOR_BGR2RGB))
-    
-    # Initialize keypoints array (2 hands, 21 landmarks, 3 coords)
-    keypoints = np.zeros((2, 21, 3), dtype=np.float32)
+def parse_keypoints(value, frames=None):
+    """
+    Client-sent keypoints -> float32 (126,), or (frames, 126) when frames is
+    given. Raises ValueError with a message for the client on anything else.
+    """
+    shape = (FEATURES,) if frames is None else (frames, FEATURES)
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        raise ValueError(f"keypoints must be a numeric array of shape {list(shape)}")
+    if array.dtype.kind not in 'iuf':
+        raise ValueError("keypoints must be numbers")
+    if array.shape != shape:
+        raise ValueError(f"keypoints must have shape {list(shape)}, got {list(array.shape)}")
+    array = array.astype(np.float32)
+    if not np.isfinite(array).all():
+        raise ValueError("keypoints must be finite")
+    return array
+
+def extract_keypoints(image, layout):
+    """Extract hand keypoints from an RGB uint8 image using MediaPipe."""
+    results = hands_pool.process(image)
     
-    if results.multi_hand_landmarks:
-        for idx, hand_landmarks in enumerate(results.multi_hand_landmarks[:2]):  # Max 2 hands
-            for i, landmark in enumerate(hand_landmarks.landmark):
-                keypoints[idx, i] = [landmark.x, landmark.y, landmark.z]
+    # (2 hands, 21 landmarks, 3 coords) in the model's hand slot layout -> flatten to (126,)
+    return landmarks_to_array(results, layout=layout).reshape(FEATURES)
+
+def predict_window(entry, buffered):
+    """(class, confidence, top 3) for a session's buffered frames, memoized per model version."""
+    # Pad to SEQ_LEN and normalize
+    sequence, length = prepare_window(buffered, SEQ_LEN)
     
-    return keypoints.reshape(126)  # Flatten to (126,)
+    cache_key = prediction_cache.key(entry.key, sequence, length)
+    result = prediction_cache.get(cache_key)
+    if result is None:
+        start = time.perf_counter()
+        result = entry.predict(sequence, length)
+        registry.record(entry.key, time.perf_counter() - start)
+        prediction_cache.put(cache_key, result)
+    else:
+        registry.record(entry.key)  # served from cache: counted, no forward pass
+    return result
 
-def load_model():
-    global model
+def load_default_model():
+    """Load the default model at startup so the first request doesn't pay for it."""
     try:
-        # Load TorchScript model with weights_only=False
-        model = torch.jit.load(MODEL_PATH, map_location=device)
-        model.eval()
-        print(f"Model loaded successfully on {device}")
-        return True
+        return registry.get()
     except Exception as e:
-        print(f"Error loading with torch.jit.load: {e}")
-        # Try regular torch.load with weights_only=False
-        try:
-            model = torch.load(MODEL_PATH, map_location=device, weights_only=False)
-            model.eval()
-            print(f"Model loaded successfully on {device}")
-            return True
-        except Exception as e2:
-            print(f"Error loading model: {e2}")
-            return False
+        print(f"Error loading model: {e}")
+        return None
 
 # Load model on startup
-load_model()
+load_default_model()
 
 @app.route('/api/health', methods=['GET'])
 def health():
+    default = load_default_model()
     return jsonify({
         'status': 'ok',
-        'model_loaded': model is not None,
+        'model_loaded': default is not None,
+        'model': registry.default,
         'device': str(device),
-        'classes': class_names
+        'classes': default.class_names if default else []
     })
 
 @app.route('/api/predict', methods=['POST'])
+@admission.limit
 def predict():
-    global keypoint_buffer
-    
-    if model is None:
-        return jsonify({'error': 'Model not loaded'}), 500
+    with profiler.maybe_profile():
+        return handle_predict()
+
+def handle_predict():
+    data = request.json or {}
+    try:
+        # Optional 'model' field: "name" or "name@version"; default model otherwise
+        entry = registry.get(data.get('model'))
+    except KeyError:
+        return jsonify({'error': f"Unknown model: {data.get('model')}"}), 404
+    except Exception as e:
+        return jsonify({'error': f'Model not loaded: {e}'}), 500
     
     try:
-        # Get image from request
-        data = request.json
-        image_data = data.get('image', '')
-        
-        # Remove data URL prefix if present
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-        
-        # Decode base64 image
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-        
-        # Extract keypoints from current frame
-        keypoints = extract_keypoints(image)
+        if 'keypoints' in data:
+            # Pre-extracted (126,) landmarks, e.g. from load tests: no decode or MediaPipe
+            try:
+                keypoints = parse_keypoints(data['keypoints'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            # Get image from request
+            image = decode_image(data.get('image', ''))
+            
+            # Extract keypoints from current frame
+            keypoints = extract_keypoints(image, entry.feature_layout)
         
         # Check if hands detected
         has_hands = np.sum(np.abs(keypoints)) > 0
@@ -149,65 +209,30 @@ def predict():
                 'confidence': 0.0
             })
         
-        # Add to buffer
-        keypoint_buffer.append(keypoints)
+        # Add to this client's buffer (keeps only the last SEQ_LEN frames)
+        session_id = str(data.get('session_id', 'default'))
+        buffered = sessions.get(session_id).append(keypoints)
+        if session_log is not None:
+            session_log.frame(session_id, entry.key, keypoints, entry.feature_layout)
         
-        # Keep only last SEQ_LEN frames
-        if len(keypoint_buffer) > SEQ_LEN:
-            keypoint_buffer = keypoint_buffer[-SEQ_LEN:]
-        
-        # Need at least 20 frames for prediction
-        if len(keypoint_buffer) < 20:
+        # Need at least MIN_FRAMES frames for prediction
+        if len(buffered) < MIN_FRAMES:
             return jsonify({
                 'success': False,
-                'message': f'Collecting frames... ({len(keypoint_buffer)}/{SEQ_LEN})',
+                'message': f'Collecting frames... ({len(buffered)}/{SEQ_LEN})',
                 'confidence': 0.0
             })
         
-        # Prepare sequence
-        sequence = np.array(keypoint_buffer, dtype=np.float32)
-        
-        # Pad if needed
-        if sequence.shape[0] < SEQ_LEN:
-            pad = np.zeros((SEQ_LEN - sequence.shape[0], INPUT_SIZE), dtype=np.float32)
-            sequence = np.vstack([sequence, pad])
-        else:
-            sequence = sequence[-SEQ_LEN:]  # Take last SEQ_LEN frames
-        
-        # Normalize
-        sequence = normalize_landmarks(sequence)
-        
-        # Convert to tensor
-        input_tensor = torch.from_numpy(sequence).unsqueeze(0).to(device)  # (1, SEQ_LEN, 126)
-        
-        # Make prediction
-        with torch.no_grad():
-            outputs = model(input_tensor)
-            probabilities = torch.nn.functional.softmax(outputs, dim=1)[0]
-            
-            confidence, predicted_idx = torch.max(probabilities, 0)
-            
-            predicted_class = class_names[predicted_idx.item()]
-            confidence_score = confidence.item()
-            
-            # Get top 3 predictions
-            top_probs, top_indices = torch.topk(probabilities, min(3, len(class_names)))
-            top_predictions = [
-                {
-                    'class': class_names[idx.item()],
-                    'confidence': prob.item()
-                }
-                for prob, idx in zip(top_probs, top_indices)
-            ]
-            
-            print(f"Prediction: {predicted_class} with confidence: {confidence_score:.2f}")
+        predicted_class, confidence_score, top_predictions = predict_window(entry, buffered)
+        print(f"Prediction: {predicted_class} with confidence: {confidence_score:.2f}")
         
         return jsonify({
             'success': True,
+            'model': entry.key,
             'prediction': predicted_class,
             'confidence': confidence_score,
             'top_predictions': top_predictions,
-            'buffer_size': len(keypoint_buffer)
+            'buffer_size': len(buffered)
         })
     
     except Exception as e:
@@ -216,18 +241,128 @@ def predict():
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict_burst', methods=['POST'])
+@admission.limit
+def predict_burst():
+    with profiler.maybe_profile():
+        return handle_predict_burst()
+
+def handle_predict_burst():
+    """
+    Several consecutive frames in one request: {"images": [...]} or
+    {"keypoints": [[126 floats], ...]}, oldest first, plus session_id and
+    optional model. Frames are decoded and landmarked across the Hands pool,
+    added to the session buffer in order, and the window is predicted once.
+    """
+    data = request.json or {}
+    try:
+        entry = registry.get(data.get('model'))
+    except KeyError:
+        return jsonify({'error': f"Unknown model: {data.get('model')}"}), 404
+    except Exception as e:
+        return jsonify({'error': f'Model not loaded: {e}'}), 500
+    
+    try:
+        batch = data.get('keypoints', data.get('images', []))
+        if not isinstance(batch, list):
+            return jsonify({'error': 'keypoints / images must be a list of frames'}), 400
+        count = len(batch)
+        if not 0 < count <= BURST_MAX_FRAMES:
+            return jsonify({'error': f'Send between 1 and {BURST_MAX_FRAMES} frames'}), 400
+        
+        if 'keypoints' in data:
+            try:
+                frames = parse_keypoints(batch, frames=count)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            # Each pool thread decodes into its own buffer and landmarks it before the next frame
+            results = hands_pool.map(data['images'], prepare=decode_image)
+            frames = np.stack([landmarks_to_array(r, layout=entry.feature_layout).reshape(FEATURES)
+                               for r in results])
+        
+        # Frames without hands are reported but not buffered, as in /api/predict
+        hands = np.abs(frames).sum(axis=1) > 0
+        session_id = str(data.get('session_id', 'default'))
+        session = sessions.get(session_id)
+        if hands.any():
+            buffered = session.extend(frames[hands])
+            if session_log is not None:
+                for keypoints in frames[hands]:
+                    session_log.frame(session_id, entry.key, keypoints, entry.feature_layout)
+        else:
+            buffered = session.snapshot()
+        
+        response = {'model': entry.key, 'hands': hands.tolist(), 'buffer_size': len(buffered)}
+        if not hands.any():
+            return jsonify(dict(response, success=False, message='No hands detected', confidence=0.0))
+        if len(buffered) < MIN_FRAMES:
+            return jsonify(dict(response, success=False, confidence=0.0,
+                                message=f'Collecting frames... ({len(buffered)}/{SEQ_LEN})'))
+        
+        # One forward pass for the window after the last frame of the burst
+        predicted_class, confidence_score, top_predictions = predict_window(entry, buffered)
+        print(f"Burst of {count}: {predicted_class} with confidence: {confidence_score:.2f}")
+        
+        return jsonify(dict(response, success=True, prediction=predicted_class,
+                            confidence=confidence_score, top_predictions=top_predictions))
+    
+    except Exception as e:
+        import traceback
+        print(f"Burst prediction error: {e}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/reset', methods=['POST'])
 def reset_buffer():
-    global keypoint_buffer
-    keypoint_buffer = []
+    data = request.get_json(silent=True) or {}
+    session_id = str(data.get('session_id', 'default'))
+    sessions.reset(session_id)
+    if session_log is not None:
+        session_log.reset(session_id)
     return jsonify({'success': True, 'message': 'Buffer reset'})
 
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    return jsonify({'admission': admission.stats(), 'models': registry.stats(),
+                    'prediction_cache': prediction_cache.stats(),
+                    'sessions': sessions.stats(),
+                    'profiler': profiler.status(),
+                    'hands_pool': hands_pool.stats()})
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    return jsonify(registry.stats())
+
+@app.route('/api/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """Set {"sample_rate": 0..1} and/or {"flush": true}. Disabled unless ADMIN_TOKEN is set."""
+    token = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    written = []
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'sample_rate' in data:
+            rate = float(data['sample_rate'])
+            if not 0 <= rate <= 1:
+                return jsonify({'error': 'sample_rate must be between 0 and 1'}), 400
+            profiler.sample_rate = rate
+        if data.get('flush'):
+            written = profiler.flush()
+    return jsonify(dict(profiler.status(), written=written))
+
 @app.route('/api/classes', methods=['GET'])
 def get_classes():
-    return jsonify({'classes': class_names})
+    # ?model=name[@version]
+    try:
+        entry = registry.get(request.args.get('model'))
+    except KeyError:
+        return jsonify({'error': f"Unknown model: {request.args.get('model')}"}), 404
+    return jsonify({'model': entry.key, 'classes': entry.class_names})
 
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 5000))
     print(f"🚀 Starting HTTP server on http://0.0.0.0:{port}")
     print(f"📱 Access from phone: http://192.168.210.53:{port}")
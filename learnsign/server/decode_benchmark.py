@@ -0,0 +1,111 @@
+"""
+Speed and accuracy of reduced-resolution JPEG decoding.
+
+Decodes every frame at full, 1/2, 1/4 and 1/8 scale, runs MediaPipe Hands on
+each and compares against the full-resolution result: hand-detection
+agreement, mean landmark error (normalized image units) and, with --model,
+top-1 agreement of the model over sliding windows.
+
+    python decode_benchmark.py --frames phone_clip.mp4 --model ../client/src/Assets/sign_model_mobile.pt
+"""
+import os
+import time
+import argparse
+
+import cv2
+import numpy as np
+import torch
+import mediapipe as mp
+
+from image_decode import decode_rgb, REDUCED_FLAGS
+from hand_features import landmarks_to_array, normalize_landmarks, FEATURES
+from model_registry import load_model_file, accepts_lengths
+
+SEQ_LEN = 40
+
+
+def load_jpegs(path, quality, max_frames):
+    """JPEG bytes as a client would upload them: image files as-is, video frames encoded at `quality`."""
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith((".jpg", ".jpeg")))[:max_frames]
+        jpegs = []
+        for f in files:
+            with open(os.path.join(path, f), "rb") as fh:
+                jpegs.append(fh.read())
+        return jpegs
+
+    cap = cv2.VideoCapture(path)
+    jpegs = []
+    while len(jpegs) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        jpegs.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+    cap.release()
+    return jpegs
+
+
+def landmark_frames(jpegs, factor, hands):
+    """(T, 2, 21, 3) keypoints, decoded shape, decode seconds and MediaPipe seconds per frame."""
+    keypoints = np.zeros((len(jpegs), 2, 21, 3), dtype=np.float32)
+    decode_s, landmark_s = [], []
+    shape = None
+    for t, data in enumerate(jpegs):
+        t0 = time.perf_counter()
+        rgb = decode_rgb(data, factor=factor)
+        t1 = time.perf_counter()
+        landmarks_to_array(hands.process(rgb), out=keypoints[t])
+        t2 = time.perf_counter()
+        decode_s.append(t1 - t0)
+        landmark_s.append(t2 - t1)
+        shape = rgb.shape
+    return keypoints, shape, np.mean(decode_s), np.mean(landmark_s)
+
+
+def window_predictions(model, keypoints, stride=5):
+    """Top-1 class of every SEQ_LEN window (stride frames apart)."""
+    takes_lengths = accepts_lengths(model)
+    flat = keypoints.reshape(len(keypoints), FEATURES)
+    preds = []
+    with torch.no_grad():
+        for start in range(0, len(flat) - SEQ_LEN + 1, stride):
+            x = torch.from_numpy(normalize_landmarks(flat[start:start + SEQ_LEN]))[None]
+            logits = model(x, torch.tensor([SEQ_LEN])) if takes_lengths else model(x)
+            preds.append(int(logits.argmax(dim=1)))
+    return np.array(preds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reduced-resolution JPEG decode: speed vs landmark accuracy")
+    parser.add_argument("--frames", required=True, help="video file or directory of JPEG frames")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality when encoding video frames")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--model", help="TorchScript model for prediction agreement")
+    args = parser.parse_args()
+
+    jpegs = load_jpegs(args.frames, args.quality, args.max_frames)
+    if not jpegs:
+        raise SystemExit("No frames found")
+    model = load_model_file(args.model, "cpu") if args.model else None
+    print(f"📌 {len(jpegs)} frames, {np.mean([len(j) for j in jpegs]) / 1024:.0f} KB average")
+
+    # Same settings as the server
+    hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.5)
+    reference = reference_preds = None
+    print(f"\n{'scale':<7}{'size':>12}{'decode ms':>11}{'hands ms':>10}{'detect agree':>14}"
+          f"{'lm error':>10}{'pred agree':>12}")
+    for factor in sorted(REDUCED_FLAGS):
+        keypoints, shape, decode_s, landmark_s = landmark_frames(jpegs, factor, hands)
+        present = np.abs(keypoints).sum(axis=(2, 3)) > 0          # (T, 2)
+        preds = window_predictions(model, keypoints) if model is not None else None
+        if reference is None:
+            reference, reference_present, reference_preds = keypoints, present, preds
+
+        detect_agree = (present == reference_present).all(axis=1).mean()
+        both = present & reference_present
+        error = (np.linalg.norm(keypoints[..., :2] - reference[..., :2], axis=-1).mean(axis=-1)[both].mean()
+                 if both.any() else float("nan"))
+        pred_agree = f"{(preds == reference_preds).mean() * 100:.1f}%" if preds is not None and len(preds) else "-"
+        print(f"1/{factor:<5}{f'{shape[1]}x{shape[0]}':>12}{decode_s * 1000:>11.2f}{landmark_s * 1000:>10.2f}"
+              f"{detect_agree * 100:>13.1f}%{error:>10.4f}{pred_agree:>12}")
+    hands.close()
@@ -0,0 +1,140 @@
+# Shared hand-feature code for training, live inference and the server.
+# Identical copies live in sign-language/scripts/ and learnsign/server/ (the server deploys
+# on its own); learnsign/server/tests/test_hand_features.py fails when they differ.
+import time
+import numpy as np
+
+HANDS, LANDMARKS, COORDS = 2, 21, 3
+FEATURES = HANDS * LANDMARKS * COORDS  # 126
+# Fixed slot per hand, from MediaPipe's handedness label (on unmirrored frames)
+HAND_SLOTS = {"Left": 0, "Right": 1}
+# Hand slot layouts: "handedness" (HAND_SLOTS, what extraction and training use
+# now) or "detection" (MediaPipe's detection order, what models trained before
+# the handedness slots expect). Exports record theirs in export.json.
+FEATURE_LAYOUT = "handedness"
+LEGACY_LAYOUT = "detection"
+LAYOUTS = (FEATURE_LAYOUT, LEGACY_LAYOUT)
+# Models see SEQ_LEN-frame windows spread evenly over a 3 s recording (90
+# frames at 30 fps -> 40), i.e. about 13 fps. Streams fed to a model frame by
+# frame (server sessions, live demo) should be sampled at this rate too.
+WINDOW_FPS = 40 / 3
+
+
+def sample_indices(n_frames, seq_len):
+    """Indices of seq_len frames spread evenly over n_frames (all of them if the clip is shorter)."""
+    if n_frames <= seq_len:
+        return list(range(n_frames))
+    return np.linspace(0, n_frames - 1, seq_len).round().astype(int).tolist()
+
+
+def landmarks_to_array(results, out=None, layout=FEATURE_LAYOUT):
+    """
+    MediaPipe Hands results -> (2, 21, 3) float32, written into `out` if given.
+    With the "handedness" layout slot 0 holds the left hand and slot 1 the
+    right one (detection order if handedness is missing or both hands claim
+    the same side); "detection" keeps detection order. A missing hand is zeros.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown feature layout {layout!r}, expected one of {LAYOUTS}")
+    if out is None:
+        out = np.zeros((HANDS, LANDMARKS, COORDS), dtype=np.float32)
+    else:
+        out.fill(0)
+
+    hands = (results.multi_hand_landmarks or [])[:HANDS]
+    if not hands:
+        return out
+
+    slots = range(len(hands))
+    if layout == FEATURE_LAYOUT:
+        handedness = results.multi_handedness or []
+        labelled = [HAND_SLOTS.get(h.classification[0].label) for h in handedness[:HANDS]]
+        if len(labelled) == len(hands) and None not in labelled and len(set(labelled)) == len(labelled):
+            slots = labelled
+
+    for slot, hand in zip(slots, hands):
+        out[slot] = np.fromiter((v for lm in hand.landmark for v in (lm.x, lm.y, lm.z)),
+                                dtype=np.float32, count=LANDMARKS * COORDS).reshape(LANDMARKS, COORDS)
+    return out
+
+
+def normalize_landmarks(seq):
+    """
+    Normalize landmarks relative to bounding box for each frame.
+    Input: (T, 126) where 126 = 21*3*2 (x,y,z for 2 hands)
+    Output: (T, 126) float32; x and y of every present hand scaled to its
+    bounding box, z and missing (all-zero) hands unchanged.
+    """
+    hands = np.array(seq, dtype=np.float32).reshape(len(seq), HANDS, LANDMARKS, COORDS)
+    present = np.abs(hands).sum(axis=(2, 3)) > 0                      # (T, 2)
+
+    xy = hands[..., :2]
+    mins = xy.min(axis=2, keepdims=True)                              # (T, 2, 1, 2)
+    ranges = xy.max(axis=2, keepdims=True) - mins
+    scale = present[..., None, None] & (ranges > 0)
+    hands[..., :2] = np.where(scale, (xy - mins) / np.where(ranges > 0, ranges, 1), xy)
+
+    return hands.reshape(len(seq), FEATURES)
+
+
+# ---------------- Micro-benchmark ---------------- #
+def _fake_results(n_hands):
+    """Objects shaped like MediaPipe Hands results, so the benchmark runs without a camera."""
+    from types import SimpleNamespace as NS
+    rng = np.random.default_rng(0)
+    labels = ["Right", "Left"]
+    return NS(
+        multi_hand_landmarks=[NS(landmark=[NS(x=float(a), y=float(b), z=float(c)) for a, b, c in rng.random((21, 3))])
+                              for _ in range(n_hands)] or None,
+        multi_handedness=[NS(classification=[NS(label=labels[i])]) for i in range(n_hands)] or None,
+    )
+
+
+def _per_landmark_assign(results):
+    # Former app.py conversion
+    keypoints = np.zeros((2, 21, 3), dtype=np.float32)
+    if results.multi_hand_landmarks:
+        for idx, hand_landmarks in enumerate(results.multi_hand_landmarks[:2]):
+            for i, landmark in enumerate(hand_landmarks.landmark):
+                keypoints[idx, i] = [landmark.x, landmark.y, landmark.z]
+    return keypoints.reshape(126)
+
+
+def _list_extend(results):
+    # Former extract_keypoints.py / live_inference.py conversion
+    points = []
+    if results.multi_hand_landmarks:
+        for hand in results.multi_hand_landmarks[:2]:
+            for lm in hand.landmark:
+                points.extend([lm.x, lm.y, lm.z])
+        if len(results.multi_hand_landmarks) == 1:
+            points.extend([0] * 63)
+    else:
+        points.extend([0] * 126)
+    return np.array(points, dtype=np.float32)
+
+
+if __name__ == "__main__":
+    runs = 20000
+    buf = np.zeros((HANDS, LANDMARKS, COORDS), dtype=np.float32)
+    candidates = [
+        ("per-landmark assign", _per_landmark_assign),
+        ("list extend", _list_extend),
+        ("landmarks_to_array", lambda r: landmarks_to_array(r, buf)),
+    ]
+    print(f"{'conversion':<22}{'0 hands':>10}{'1 hand':>10}{'2 hands':>10}   (µs/frame)")
+    for name, fn in candidates:
+        row = []
+        for n_hands in range(3):
+            results = _fake_results(n_hands)
+            start = time.perf_counter()
+            for _ in range(runs):
+                fn(results)
+            row.append((time.perf_counter() - start) / runs * 1e6)
+        print(f"{name:<22}" + "".join(f"{us:>10.2f}" for us in row))
+
+    window = np.random.default_rng(0).random((40, FEATURES)).astype(np.float32)
+    start = time.perf_counter()
+    for _ in range(runs // 10):
+        normalize_landmarks(window)
+    print(f"\nnormalize_landmarks (40 frames): {(time.perf_counter() - start) / (runs // 10) * 1e6:.1f} µs/window")
@@ -0,0 +1,139 @@
+"""
+Landmarking throughput and memory: one process with a HandsPool of N graphs
+(threads, one model copy) vs N processes with one graph each (the
+gunicorn-worker model, each loading torch and the model).
+
+Every configuration runs in a fresh interpreter, so memory freed by an
+earlier one can't inflate it. Memory is PSS (proportional set size, from
+/proc/<pid>/smaps_rollup): pages shared through fork are split between the
+processes that map them instead of counted in each. The process column is
+the parent plus its workers.
+
+    python hands_benchmark.py --frames clip.mp4 --workers 1 2 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import multiprocessing as mproc
+
+import cv2
+import torch
+import mediapipe as mp
+
+from hands_pool import HandsPool
+from model_registry import load_model_file
+
+HANDS_PARAMS = dict(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.5)
+DEFAULT_MODEL = "../client/src/Assets/sign_model_mobile.pt"
+
+_frames = None
+_hands = None
+_model = None
+
+
+def load_frames(path, max_frames):
+    """RGB frames from a video file or a directory of images."""
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        images = [cv2.imread(os.path.join(path, f)) for f in files[:max_frames]]
+    else:
+        cap = cv2.VideoCapture(path)
+        images = []
+        while len(images) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            images.append(frame)
+        cap.release()
+    return [cv2.cvtColor(im, cv2.COLOR_BGR2RGB) for im in images if im is not None]
+
+
+def pss_mb(pid="self"):
+    """Proportional set size of a process in MB (Linux >= 4.14)."""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_threads(frames, workers, model_path, rounds):
+    model = load_model_file(model_path, "cpu") if model_path else None
+    pool = HandsPool(workers, **HANDS_PARAMS)
+    pool.map(frames[:workers])  # warm up every graph
+    start = time.perf_counter()
+    for _ in range(rounds):
+        pool.map(frames)
+    elapsed = time.perf_counter() - start
+    memory = pss_mb()
+    pool.close()
+    del model
+    return len(frames) * rounds / elapsed, memory
+
+
+def _init_process(model_path):
+    global _hands, _model
+    _hands = mp.solutions.hands.Hands(**HANDS_PARAMS)
+    _model = load_model_file(model_path, "cpu") if model_path else None
+
+
+def _process_frame(index):
+    _hands.process(_frames[index])
+    return index
+
+
+def run_processes(frames, workers, model_path, rounds):
+    global _frames
+    _frames = frames  # inherited by the forked workers
+    ctx = mproc.get_context("fork")
+    with ctx.Pool(workers, initializer=_init_process, initargs=(model_path,)) as pool:
+        pool.map(_process_frame, range(min(workers * 2, len(frames))))  # warm up
+        start = time.perf_counter()
+        for _ in range(rounds):
+            pool.map(_process_frame, range(len(frames)), chunksize=1)
+        elapsed = time.perf_counter() - start
+        memory = pss_mb() + sum(pss_mb(p.pid) for p in mproc.active_children())
+    return len(frames) * rounds / elapsed, memory
+
+
+def run_isolated(mode, args, workers):
+    """(frames/s, MB) of one configuration, measured in a fresh interpreter."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--frames", args.frames, "--max-frames", str(args.max_frames),
+           "--rounds", str(args.rounds), "--model", args.model, "--workers", str(workers), "--run", mode]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"❌ {mode} x {workers} failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["fps"], result["mb"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HandsPool threads vs process-per-worker landmarking")
+    parser.add_argument("--frames", required=True, help="video file or directory of images")
+    parser.add_argument("--max-frames", type=int, default=120)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="model each process loads ('' for none)")
+    parser.add_argument("--run", choices=["threads", "processes"], help=argparse.SUPPRESS)  # one isolated config
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    frames = load_frames(args.frames, args.max_frames)
+    if not frames:
+        raise SystemExit("No frames found")
+
+    if args.run:
+        run = run_threads if args.run == "threads" else run_processes
+        fps, mb = run(frames, args.workers[0], args.model, args.rounds)
+        print(json.dumps({"fps": fps, "mb": mb}))
+        raise SystemExit(0)
+
+    print(f"📌 {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {os.cpu_count()} CPUs")
+    print(f"\n{'workers':<9}{'threads fps':>13}{'threads MB':>12}{'processes fps':>15}{'processes MB':>14}")
+    for workers in args.workers:
+        thread_fps, thread_mb = run_isolated("threads", args, workers)
+        process_fps, process_mb = run_isolated("processes", args, workers)
+        print(f"{workers:<9}{thread_fps:>13.1f}{thread_mb:>12.0f}{process_fps:>15.1f}{process_mb:>14.0f}")
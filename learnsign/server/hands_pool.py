@@ -0,0 +1,67 @@
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import mediapipe as mp
+
+
+class HandsPool:
+    """
+    `size` MediaPipe Hands graphs shared by the threads of one process.
+
+    A graph is not thread-safe, so each call borrows a free one; MediaPipe's
+    native code releases the GIL, so up to `size` frames are landmarked on
+    separate cores while the process keeps a single copy of torch and the
+    models. process() runs on the calling (request) thread; map() spreads a
+    batch of frames over the pool's own threads.
+    """
+
+    def __init__(self, size=2, **hands_params):
+        self.size = size
+        self._free = queue.Queue()
+        for _ in range(size):
+            self._free.put(mp.solutions.hands.Hands(**hands_params))
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="hands")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited = 0  # calls that found every graph busy
+
+    @contextmanager
+    def acquire(self):
+        try:
+            hands = self._free.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.waited += 1
+            hands = self._free.get()
+        try:
+            yield hands
+        finally:
+            self._free.put(hands)
+
+    def process(self, image):
+        """MediaPipe results for one RGB uint8 image."""
+        with self._lock:
+            self.calls += 1
+        with self.acquire() as hands:
+            return hands.process(image)
+
+    def map(self, images, prepare=None):
+        """
+        Results for several images, in order, landmarked concurrently.
+        `prepare` (e.g. a decoder) turns each item into an RGB image on the
+        pool thread first, so decoding is spread over the pool as well.
+        """
+        if prepare is None:
+            return list(self._executor.map(self.process, images))
+        return list(self._executor.map(lambda item: self.process(prepare(item)), images))
+
+    def close(self):
+        self._executor.shutdown()
+        for _ in range(self.size):
+            self._free.get().close()
+
+    def stats(self):
+        with self._lock:
+            return {'size': self.size, 'free': self._free.qsize(), 'calls': self.calls, 'waited': self.waited}
@@ -0,0 +1,91 @@
+import struct
+import threading
+
+import cv2
+import numpy as np
+import simplejpeg
+
+# Longest side the landmark model needs; JPEGs at least 2x larger are decoded
+# at 1/2, 1/4 or 1/8 scale straight from the DCT coefficients.
+DEFAULT_TARGET_SIDE = 640
+
+REDUCED_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    1: cv2.IMREAD_COLOR,
+}
+# Start-of-frame markers (baseline, progressive, ...); they carry height and width
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_local = threading.local()
+
+
+def jpeg_size(data):
+    """(height, width) from the JPEG header without decoding, or None if not a JPEG."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return height, width
+        i += 2 + length
+    return None
+
+
+def reduction_for(size, target_side=DEFAULT_TARGET_SIDE):
+    """Largest of 8/4/2 that keeps the longest side >= target_side (1 if none, or size unknown)."""
+    if size is None or target_side <= 0:
+        return 1
+    longest = max(size)
+    for factor in (8, 4, 2):
+        if longest // factor >= target_side:
+            return factor
+    return 1
+
+
+def _thread_buffer(nbytes):
+    """This thread's decode buffer, grown to at least nbytes."""
+    buf = getattr(_local, "buf", None)
+    if buf is None or len(buf) < nbytes:
+        buf = _local.buf = np.empty(nbytes, dtype=np.uint8)
+    return buf
+
+
+def decode_rgb(data, target_side=DEFAULT_TARGET_SIDE, factor=None):
+    """
+    Encoded image bytes -> RGB uint8 (H, W, 3), JPEGs decoded at reduced scale
+    (`factor` forces one of 1/2/4/8).
+
+    JPEGs are decoded by libjpeg-turbo (simplejpeg) straight to RGB into a
+    per-thread buffer, without allocating: the returned array is a view of
+    that buffer, so the caller must be done with it (or copy it) before the
+    same thread decodes the next image. Other formats, and JPEGs libjpeg-turbo
+    rejects (CMYK, corrupt data), go through cv2.imdecode, which allocates.
+    """
+    size = jpeg_size(data)
+    if factor is None:
+        factor = reduction_for(size, target_side)
+    if size is not None:
+        # libjpeg scales to ceil(side / factor); asking for exactly that picks `factor`
+        height, width = -(-size[0] // factor), -(-size[1] // factor)
+        try:
+            return simplejpeg.decode_jpeg(data, "RGB", min_height=height, min_width=width,
+                                          min_factor=factor, buffer=_thread_buffer(height * width * 3))
+        except ValueError:
+            pass
+
+    bgr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), REDUCED_FLAGS[factor])
+    if bgr is None:
+        raise ValueError("Could not decode image")
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=bgr)
@@ -0,0 +1,247 @@
+"""
+Load generator for the prediction server.
+
+Simulates N concurrent signers, each with its own session_id, streaming
+recorded frames (JPEG, full server path) or keypoint sequences (skips decode
+and MediaPipe) to /api/predict at a target fps, or to /api/predict_burst in
+groups of --burst frames. Reports achieved request and frame rates, latency
+percentiles, error and shed (503) rates, and the server's admission stats
+polled from /api/stats while the test runs.
+
+    pip install -r requirements-dev.txt  # requests
+    python app.py                        # or: gunicorn app:app --bind 127.0.0.1:5000 --threads 6
+    python loadgen.py --keypoints ../../sign-language/keypoints_record/hello --sessions 8 --fps 10
+    python loadgen.py --frames clip.mp4 --sessions 4 --fps 3.3 --duration 60
+    python loadgen.py --frames clip.mp4 --sessions 4 --fps 10 --burst 3   # /api/predict_burst
+"""
+import os
+import json
+import time
+import base64
+import argparse
+import threading
+
+import numpy as np
+import requests
+
+
+def load_frames(path, max_frames=300):
+    """JPEG data URLs from a video file or a directory of images."""
+    import cv2
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        images = (cv2.imread(os.path.join(path, f)) for f in files)
+    else:
+        cap = cv2.VideoCapture(path)
+        images = iter(lambda: cap.read()[1], None)
+
+    payloads = []
+    for image in images:
+        if image is None or len(payloads) >= max_frames:
+            break
+        ok, jpeg = cv2.imencode(".jpg", image)
+        if ok:
+            payloads.append({'image': "data:image/jpeg;base64," + base64.b64encode(jpeg.tobytes()).decode()})
+    return payloads
+
+
+def load_keypoints(path):
+    """One (126,) frame per payload from a .npy file or every .npy in a directory."""
+    files = [path] if path.endswith(".npy") else sorted(
+        os.path.join(path, f) for f in os.listdir(path) if f.endswith(".npy"))
+    payloads = []
+    for f in files:
+        for frame in np.load(f).reshape(-1, 126):
+            payloads.append({'keypoints': frame.tolist()})
+    return payloads
+
+
+class SessionResult:
+    def __init__(self, session_id, burst=1):
+        self.session_id = session_id
+        self.burst = burst  # frames per request
+        self.latencies = []
+        self.ok = 0
+        self.frames = 0  # frames in successful requests
+        self.predictions = 0
+        self.shed = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    @property
+    def sent(self):
+        return self.ok + self.shed + self.errors
+
+    def rates(self):
+        """(requests/s, frames/s) this session sent."""
+        rps = self.sent / max(self.elapsed, 1e-9)
+        return rps, rps * self.burst
+
+
+def burst_payload(frames):
+    """/api/predict_burst body for consecutive single-frame payloads."""
+    if 'image' in frames[0]:
+        return {'images': [f['image'] for f in frames]}
+    return {'keypoints': [f['keypoints'] for f in frames]}
+
+
+def run_session(base_url, session_id, payloads, offset, fps, duration, model, timeout, result, burst=1):
+    http = requests.Session()
+    http.post(f"{base_url}/reset", json={'session_id': session_id}, timeout=timeout)
+    interval = burst / fps
+    endpoint = f"{base_url}/predict" if burst == 1 else f"{base_url}/predict_burst"
+    start = time.perf_counter()
+    next_send = start
+    i = offset
+
+    while time.perf_counter() - start < duration:
+        if burst == 1:
+            payload = dict(payloads[i % len(payloads)])
+        else:
+            payload = burst_payload([payloads[(i + k) % len(payloads)] for k in range(burst)])
+        payload['session_id'] = session_id
+        if model:
+            payload['model'] = model
+        i += burst
+
+        t0 = time.perf_counter()
+        try:
+            response = http.post(endpoint, json=payload, timeout=timeout)
+            if response.status_code == 200:
+                result.ok += 1
+                result.frames += burst
+                result.latencies.append(time.perf_counter() - t0)
+                result.predictions += bool(response.json().get('success'))
+            elif response.status_code == 503:
+                result.shed += 1
+            else:
+                result.errors += 1
+        except requests.RequestException:
+            result.errors += 1
+
+        # Keep the schedule, but never burst to catch up after a slow response
+        next_send = max(next_send + interval, time.perf_counter())
+        time.sleep(max(0.0, next_send - time.perf_counter()))
+
+    result.elapsed = time.perf_counter() - start
+
+
+class StatsPoller(threading.Thread):
+    """Samples /api/stats; with several gunicorn workers each poll sees one of them."""
+
+    def __init__(self, base_url, interval):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = []
+        self.stop = threading.Event()
+
+    def poll(self):
+        try:
+            return requests.get(f"{self.base_url}/stats", timeout=2).json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            sample = self.poll()
+            if sample is not None:
+                self.samples.append(sample)
+
+
+def report(results, before, after, samples, wall_s):
+    print(f"\n{'session':<12}{'sent':>7}{'ok':>7}{'shed':>7}{'errors':>8}{'req/s':>8}{'frames/s':>10}")
+    for r in results:
+        rps, fps = r.rates()
+        print(f"{r.session_id:<12}{r.sent:>7}{r.ok:>7}{r.shed:>7}{r.errors:>8}{rps:>8.2f}{fps:>10.2f}")
+
+    sent = sum(r.sent for r in results)
+    latencies = np.array([l for r in results for l in r.latencies]) * 1000
+    summary = {
+        'sessions': len(results),
+        'requests': sent,
+        'throughput_rps': sent / wall_s,
+        'ok_rps': sum(r.ok for r in results) / wall_s,
+        'frames_per_s': sum(r.frames for r in results) / wall_s,
+        'predictions': sum(r.predictions for r in results),
+        'shed_rate': sum(r.shed for r in results) / max(1, sent),
+        'error_rate': sum(r.errors for r in results) / max(1, sent),
+        'rps_per_session_mean': float(np.mean([r.rates()[0] for r in results])),
+        'fps_per_session_mean': float(np.mean([r.rates()[1] for r in results])),
+    }
+    if len(latencies):
+        for p in (50, 95, 99):
+            summary[f'latency_ms_p{p}'] = float(np.percentile(latencies, p))
+        summary['latency_ms_max'] = float(latencies.max())
+
+    print(f"\nThroughput: {summary['throughput_rps']:.1f} req/s ({summary['ok_rps']:.1f} ok/s, "
+          f"{summary['frames_per_s']:.1f} frames/s); per session {summary['rps_per_session_mean']:.2f} req/s, "
+          f"{summary['fps_per_session_mean']:.2f} frames/s")
+    if len(latencies):
+        print(f"Latency ms: p50 {summary['latency_ms_p50']:.1f} | p95 {summary['latency_ms_p95']:.1f} | "
+              f"p99 {summary['latency_ms_p99']:.1f} | max {summary['latency_ms_max']:.1f}")
+    print(f"Shed: {summary['shed_rate']*100:.1f}% | Errors: {summary['error_rate']*100:.1f}%")
+
+    admissions = [s['admission'] for s in samples if 'admission' in s]
+    if admissions:
+        summary['server_max_queue_depth'] = max(a['queue_depth'] for a in admissions)
+        summary['server_mean_inflight'] = float(np.mean([a['inflight'] for a in admissions]))
+        print(f"Server: max queue depth {summary['server_max_queue_depth']}, "
+              f"mean in-flight {summary['server_mean_inflight']:.2f}")
+    if before and after:
+        counts = {k: after['admission'][k] - before['admission'].get(k, 0)
+                  for k in ('admitted', 'shed_queue_full', 'shed_timeout', 'dropped_stale')}
+        summary['server_admission'] = counts
+        summary['server_prediction_cache'] = after.get('prediction_cache')
+        print("Server admission: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session load test against a local prediction server")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--frames", help="video file or directory of images (full image path)")
+    source.add_argument("--keypoints", help=".npy keypoint sequence or directory of them")
+    parser.add_argument("--url", default="http://localhost:5000/api")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=1 / 0.3, help="target frames per second per session")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--burst", type=int, default=1,
+                        help="frames per request; > 1 sends them to /api/predict_burst")
+    parser.add_argument("--model", help="model name[@version] to route to")
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between /api/stats samples")
+    parser.add_argument("--out", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    payloads = load_frames(args.frames) if args.frames else load_keypoints(args.keypoints)
+    if not payloads:
+        raise SystemExit("No frames found")
+    print(f"📌 {args.sessions} sessions x {args.fps:.1f} fps for {args.duration:.0f}s, "
+          f"{len(payloads)} {'images' if args.frames else 'keypoint frames'}, {args.burst} per request")
+
+    poller = StatsPoller(args.url, args.poll)
+    before = poller.poll()
+    results = [SessionResult(f"load-{i}", args.burst) for i in range(args.sessions)]
+    # Stagger starting frames so sessions don't send identical windows
+    threads = [threading.Thread(target=run_session, args=(args.url, r.session_id, payloads,
+                                                          i * len(payloads) // args.sessions, args.fps,
+                                                          args.duration, args.model, args.timeout, r,
+                                                          args.burst))
+               for i, r in enumerate(results)]
+
+    start = time.perf_counter()
+    poller.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_s = time.perf_counter() - start
+    poller.stop.set()
+    poller.join()
+
+    summary = report(results, before, poller.poll(), poller.samples, wall_s)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSaved summary to {args.out}")
@@ -0,0 +1,230 @@
+import os
+import json
+import inspect
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import torch
+
+from hand_features import FEATURE_LAYOUT, LEGACY_LAYOUT, LAYOUTS
+
+
+def accepts_lengths(m):
+    """Length-aware exports take forward(x, lengths); older ones only forward(x)."""
+    try:
+        return len(m.forward.schema.arguments) > 2  # self, x, lengths
+    except AttributeError:
+        return len(inspect.signature(m.forward).parameters) > 1
+
+
+def load_model_file(path, device, extra_files=None):
+    """TorchScript export, or a pickled nn.Module as a fallback. `extra_files` is filled as in torch.jit.load."""
+    try:
+        model = torch.jit.load(path, map_location=device, _extra_files=extra_files)
+    except Exception as e:
+        print(f"Error loading with torch.jit.load: {e}")
+        model = torch.load(path, map_location=device, weights_only=False)
+    model.eval()
+    return model
+
+
+def load_model_with_layout(path, device, layout=None):
+    """
+    (model, hand feature layout). The layout is `layout` if given, else the one
+    recorded in the export's export.json; exports without one predate the
+    handedness slots and expect detection order.
+    """
+    extra_files = {"export.json": ""}
+    model = load_model_file(path, device, extra_files)
+    if layout is None:
+        info = json.loads(extra_files["export.json"]) if extra_files["export.json"] else None
+        # export.json without the field: exported by export_model.py before it was recorded, after the slot change
+        layout = info.get("feature_layout", FEATURE_LAYOUT) if info is not None else LEGACY_LAYOUT
+    if layout not in LAYOUTS:
+        raise ValueError(f"{path}: unknown feature_layout {layout!r}, expected one of {LAYOUTS}")
+    return model, layout
+
+
+def model_bytes(model):
+    """Memory held by parameters and buffers."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class LoadedModel:
+    def __init__(self, key, model, class_names, size_bytes, device='cpu', feature_layout=FEATURE_LAYOUT):
+        self.key = key
+        self.feature_layout = feature_layout  # hand slot layout keypoints must be extracted with
+        self.model = model
+        self.class_names = class_names
+        self.takes_lengths = accepts_lengths(model)
+        self.size_bytes = size_bytes
+        self.device = device
+
+    def predict(self, sequence, length):
+        """Forward pass on a normalized (SEQ_LEN, 126) window -> (class, confidence, top 3)."""
+        input_tensor = torch.from_numpy(sequence).unsqueeze(0).to(self.device)  # (1, SEQ_LEN, 126)
+
+        with torch.no_grad():
+            if self.takes_lengths:
+                # Padding frames are skipped by the LSTM and masked out of attention
+                outputs = self.model(input_tensor, torch.tensor([length]))
+            else:
+                outputs = self.model(input_tensor)
+            probabilities = torch.nn.functional.softmax(outputs, dim=1)[0]
+
+            confidence, predicted_idx = torch.max(probabilities, 0)
+
+            # Get top 3 predictions
+            top_probs, top_indices = torch.topk(probabilities, min(3, len(self.class_names)))
+            top_predictions = [
+                {'class': self.class_names[idx.item()], 'confidence': prob.item()}
+                for prob, idx in zip(top_probs, top_indices)
+            ]
+
+        return self.class_names[predicted_idx.item()], confidence.item(), top_predictions
+
+
+class ModelRegistry:
+    """
+    Models by name and version, loaded on first use and kept in an LRU cache
+    bounded by `max_bytes` of parameters. The default model is never evicted.
+
+    specs: list of {"name", "version", "path", "class_names"} and optionally
+    "feature_layout" ("handedness" or "detection", default: from the export).
+    A request names a model as "name@version" or just "name" (the last listed
+    version).
+    """
+
+    def __init__(self, specs, default=None, max_bytes=512 * 1024 ** 2, device='cpu'):
+        if not specs:
+            raise ValueError("Model registry needs at least one model")
+        self.specs = {f"{s['name']}@{s['version']}": s for s in specs}
+        self.latest = {s['name']: f"{s['name']}@{s['version']}" for s in specs}
+        self.default = self.resolve(default or specs[0]['name'])
+        self.max_bytes = max_bytes
+        self.device = device
+
+        self._loaded = OrderedDict()  # key -> LoadedModel, least recently used first
+        self._loading = {}  # key -> Event set when its in-progress load finishes
+        self._lock = threading.Lock()
+        self._stats = {key: {'requests': 0, 'cache_hits': 0, 'loads': 0, 'evictions': 0,
+                             'forward_ms': deque(maxlen=1000)}
+                       for key in self.specs}
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        models.json: {"default": "asl6", "models": [{"name": "asl6", "version": "1",
+        "path": "...pt", "class_names": "...json"}, ...]}. Relative paths are
+        resolved against the file's directory.
+        """
+        with open(path) as f:
+            config = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        specs = []
+        for spec in config['models']:
+            spec = dict(spec, version=str(spec.get('version', '1')))
+            for field in ('path', 'class_names'):
+                spec[field] = os.path.join(base, spec[field])
+            specs.append(spec)
+        return cls(specs, default=config.get('default'), **kwargs)
+
+    def resolve(self, name):
+        """Registry key for "name@version" or "name"; KeyError if unknown."""
+        if name in self.specs:
+            return name
+        if name in self.latest:
+            return self.latest[name]
+        raise KeyError(name)
+
+    def get(self, name=None):
+        """
+        LoadedModel for `name` (default model if None), loading it if needed.
+        Loads run outside the registry lock, so a cold model only blocks the
+        requests for that model; concurrent requests for it wait for one load.
+        """
+        key = self.resolve(name) if name else self.default
+        while True:
+            with self._lock:
+                entry = self._loaded.get(key)
+                if entry is not None:
+                    self._loaded.move_to_end(key)
+                    return entry
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another request is loading it: wait, then take it (or retry if that load failed)
+            loading.wait()
+
+        try:
+            entry = self._load(key)
+            with self._lock:
+                self._loaded[key] = entry
+                self._stats[key]['loads'] += 1
+                self._evict(keep=key)
+            return entry
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def _load(self, key):
+        spec = self.specs[key]
+        model, layout = load_model_with_layout(spec['path'], self.device, spec.get('feature_layout'))
+        with open(spec['class_names']) as f:
+            class_names = json.load(f)
+        entry = LoadedModel(key, model, class_names, model_bytes(model), self.device, layout)
+        print(f"Model {key} loaded on {self.device} ({entry.size_bytes / 1024 ** 2:.1f} MB, {layout} hand layout)")
+        return entry
+
+    def _evict(self, keep):
+        # Requests already holding an evicted model finish with their reference
+        while sum(e.size_bytes for e in self._loaded.values()) > self.max_bytes:
+            victim = next((k for k in self._loaded if k not in (keep, self.default)), None)
+            if victim is None:
+                break
+            del self._loaded[victim]
+            self._stats[victim]['evictions'] += 1
+            print(f"Model {victim} evicted")
+
+    def record(self, key, forward_s=None):
+        """
+        Count a served prediction and refresh the model's LRU recency.
+        forward_s is the forward pass time, None when the prediction cache answered.
+        """
+        with self._lock:
+            self._stats[key]['requests'] += 1
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+            if forward_s is None:
+                self._stats[key]['cache_hits'] += 1
+            else:
+                self._stats[key]['forward_ms'].append(forward_s * 1000)
+
+    def stats(self):
+        with self._lock:
+            models = {}
+            for key, s in self._stats.items():
+                forward = np.array(s['forward_ms'])
+                entry = self._loaded.get(key)
+                models[key] = {
+                    'loaded': entry is not None,
+                    'feature_layout': entry.feature_layout if entry else None,
+                    'size_mb': round(entry.size_bytes / 1024 ** 2, 2) if entry else None,
+                    'requests': s['requests'],
+                    'cache_hits': s['cache_hits'],
+                    'loads': s['loads'],
+                    'evictions': s['evictions'],
+                    # Forward passes only: cache hits don't run the model
+                    'forward_ms_mean': round(float(forward.mean()), 2) if len(forward) else None,
+                    'forward_ms_p95': round(float(np.percentile(forward, 95)), 2) if len(forward) else None,
+                }
+            return {
+                'default': self.default,
+                'loaded_mb': round(sum(e.size_bytes for e in self._loaded.values()) / 1024 ** 2, 2),
+                'max_mb': round(self.max_bytes / 1024 ** 2, 2),
+                'models': models,
+            }
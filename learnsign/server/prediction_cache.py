@@ -0,0 +1,63 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    LRU cache of model outputs for normalized keypoint windows.
+
+    Windows are quantized to steps of `tolerance` before hashing, so a hand
+    holding still (landmark jitter below the step) maps to the same key and
+    skips the forward pass. The model key ("name@version") is part of the
+    cache key, so models never share entries. max_entries=0 disables caching.
+    """
+
+    def __init__(self, max_entries=1024, tolerance=0.01):
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, model_key, sequence, length):
+        quantized = np.round(np.asarray(sequence, dtype=np.float32) / self.tolerance).astype(np.int32)
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+        digest.update(str(length).encode())
+        return model_key, digest.hexdigest()
+
+    def get(self, key):
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'tolerance': self.tolerance,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
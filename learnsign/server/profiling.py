@@ -0,0 +1,135 @@
+import os
+import time
+import pstats
+import random
+import cProfile
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+import torch
+
+_NOT_SAMPLED = nullcontext()
+
+
+class SamplingProfiler:
+    """
+    Runs a random `sample_rate` fraction of requests under cProfile and
+    torch.profiler. Every `flush_every` samples the aggregate is written to
+    out_dir as <stamp>.prof (pstats: snakeviz, flameprof) and <stamp>.folded
+    (folded stacks of torch ops: flamegraph.pl, speedscope). Oldest files are
+    deleted beyond `max_bytes`.
+
+    With sample_rate 0 a request costs one comparison. Only one request is
+    profiled at a time; others arriving meanwhile run unprofiled.
+    """
+
+    def __init__(self, sample_rate=0.0, out_dir="profiles", flush_every=20, max_bytes=100 * 1024 ** 2):
+        self.sample_rate = sample_rate
+        self.out_dir = out_dir
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+
+        self._busy = threading.Lock()   # held while a request is profiled
+        self._lock = threading.Lock()   # guards the aggregates below
+        self._stats = None
+        self._stacks = Counter()
+        self.pending = 0
+        self.sampled = 0
+        self.files_written = 0
+
+    def maybe_profile(self):
+        """Context manager for one request: profiles it if sampled, else does nothing."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return _NOT_SAMPLED
+        return self._profile()
+
+    @contextmanager
+    def _profile(self):
+        if not self._busy.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU],
+                                        with_stack=True) as torch_prof:
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+            self._add(profiler, torch_prof)
+        finally:
+            self._busy.release()
+
+    def _add(self, profiler, torch_prof):
+        fd, path = tempfile.mkstemp(suffix=".folded")
+        os.close(fd)
+        try:
+            torch_prof.export_stacks(path, "self_cpu_time_total")
+            stacks = _read_folded(path)
+        finally:
+            os.remove(path)
+
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self._stacks.update(stacks)
+            self.pending += 1
+            self.sampled += 1
+            flush = self.pending >= self.flush_every
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Write the aggregate collected so far; returns the written paths."""
+        with self._lock:
+            if self.pending == 0:
+                return []
+            stats, stacks = self._stats, self._stacks
+            self._stats, self._stacks, self.pending = None, Counter(), 0
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}-{self.files_written}"
+        prof_path = os.path.join(self.out_dir, f"{stamp}.prof")
+        folded_path = os.path.join(self.out_dir, f"{stamp}.folded")
+        stats.dump_stats(prof_path)
+        with open(folded_path, "w") as f:
+            for stack, value in stacks.most_common():
+                f.write(f"{stack} {value}\n")
+        self.files_written += 1
+        self._enforce_disk_limit()
+        return [prof_path, folded_path]
+
+    def _enforce_disk_limit(self):
+        files = [os.path.join(self.out_dir, f) for f in os.listdir(self.out_dir)
+                 if f.endswith((".prof", ".folded"))]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(f) for f in files)
+        while files and total > self.max_bytes:
+            oldest = files.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+
+    def status(self):
+        with self._lock:
+            return {
+                'sample_rate': self.sample_rate,
+                'sampled': self.sampled,
+                'pending': self.pending,
+                'files_written': self.files_written,
+                'out_dir': self.out_dir,
+            }
+
+
+def _read_folded(path):
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, value = line.rstrip("\n").rpartition(" ")
+            if stack:
+                stacks[stack] += int(float(value))
+    return stacks
@@ -0,0 +1,156 @@
+"""
+Replay session logs (SESSION_LOG_DIR) through the server's buffering,
+normalization and model path, deterministically and without Flask or MediaPipe.
+
+Reports throughput and, with several --model, how often their predictions
+differ from the first one on the recorded traffic.
+
+Keypoints are logged in the hand slot layout of the model that served them,
+so only models with one feature_layout can be compared, and frames logged in
+another layout are skipped (and counted). Logs written before layouts were
+recorded need --assume-layout.
+
+    python replay_sessions.py session_logs/ --model asl6@2-student --model models/student_v3.pt
+    python replay_sessions.py session_logs/ --model models/new.pt --speed original
+"""
+import os
+import glob
+import heapq
+import time
+import argparse
+from collections import Counter
+
+import numpy as np
+
+from model_registry import ModelRegistry
+from hand_features import LAYOUTS
+from session_log import read_log, FRAME, RESET
+from sessions import SessionStore, prepare_window, MIN_FRAMES
+
+SEQ_LEN = 40
+DEFAULT_CLASSES = "../client/src/Assets/class_names.json"
+
+
+def log_files(paths):
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.skl"))) if os.path.isdir(path) else [path])
+    return files
+
+
+def build_registry(models, registry_path, classes):
+    """Models named in a models.json registry, or given as .pt/.pth paths."""
+    base = ModelRegistry.from_file(registry_path) if os.path.exists(registry_path) else None
+    specs, keys = [], []
+    for name in models:
+        if name.endswith((".pt", ".pth")):
+            spec = {'name': os.path.basename(name), 'version': 'file', 'path': name, 'class_names': classes}
+        elif base is not None:
+            spec = base.specs[base.resolve(name)]
+        else:
+            raise SystemExit(f"Unknown model {name}: no {registry_path}")
+        specs.append(spec)
+        keys.append(f"{spec['name']}@{spec['version']}")
+    # Keep every compared model resident
+    return ModelRegistry(specs, max_bytes=float("inf")), keys
+
+
+def common_layout(entries):
+    """The hand slot layout every compared model takes; SystemExit if they differ."""
+    layouts = {entry.feature_layout for entry in entries}
+    if len(layouts) > 1:
+        found = ", ".join(f"{entry.key}: {entry.feature_layout}" for entry in entries)
+        raise SystemExit(f"Models take different hand slot layouts ({found}); "
+                         f"keypoints logged for one are misplaced for the other, so they can't be compared")
+    return layouts.pop()
+
+
+def replay(files, registry, keys, speed="max", max_gap=5.0, assume_layout=None):
+    events = heapq.merge(*(read_log(f) for f in files), key=lambda e: e[1])
+    sessions = SessionStore(SEQ_LEN, max_sessions=1 << 30, ttl_s=float("inf"))
+    entries = [registry.get(k) for k in keys]
+    layout = common_layout(entries)
+    predictions = {k: [] for k in keys}
+    forward_s = Counter()
+    frames = 0
+    skipped = Counter()
+    seen = set()
+
+    start = time.perf_counter()
+    replay_clock = start
+    last_ts = None
+    for kind, ts, session_id, _model, frame_layout, keypoints in events:
+        if speed == "original" and last_ts is not None:
+            # Original inter-arrival times, with idle gaps capped at max_gap
+            replay_clock += min(max(ts - last_ts, 0.0), max_gap)
+            time.sleep(max(0.0, replay_clock - time.perf_counter()))
+        last_ts = ts
+
+        if kind == RESET:
+            sessions.reset(session_id)
+            continue
+        if kind != FRAME:
+            continue
+        frame_layout = frame_layout or assume_layout
+        if frame_layout is None:
+            raise SystemExit("Log written before layouts were recorded: pass --assume-layout")
+        if frame_layout != layout:
+            skipped[frame_layout] += 1
+            continue
+        frames += 1
+        seen.add(session_id)
+        buffered = sessions.get(session_id).append(keypoints)
+        if len(buffered) < MIN_FRAMES:
+            continue
+
+        sequence, length = prepare_window(buffered, SEQ_LEN)
+        for entry in entries:
+            t0 = time.perf_counter()
+            predicted_class, confidence, _ = entry.predict(sequence, length)
+            forward_s[entry.key] += time.perf_counter() - t0
+            predictions[entry.key].append((predicted_class, confidence))
+
+    return frames, len(seen), predictions, forward_s, time.perf_counter() - start, skipped
+
+
+def report(frames, n_sessions, predictions, forward_s, wall_s, skipped, keys):
+    windows = len(predictions[keys[0]])
+    print(f"\nReplayed {frames} frames from {n_sessions} sessions in {wall_s:.1f}s "
+          f"({frames / max(wall_s, 1e-9):.1f} frames/s), {windows} windows predicted")
+    for frame_layout, n in skipped.items():
+        print(f"Skipped {n} frames logged in the {frame_layout!r} layout")
+    print(f"\n{'model':<28}{'windows/s':>11}{'ms/window':>11}")
+    for key in keys:
+        print(f"{key:<28}{windows / max(forward_s[key], 1e-9):>11.1f}{forward_s[key] / max(1, windows) * 1000:>11.2f}")
+
+    baseline = predictions[keys[0]]
+    for key in keys[1:]:
+        other = predictions[key]
+        differ = Counter((a[0], b[0]) for a, b in zip(baseline, other) if a[0] != b[0])
+        agree = 1 - sum(differ.values()) / max(1, windows)
+        conf_diff = np.mean([abs(a[1] - b[1]) for a, b in zip(baseline, other)]) if windows else 0.0
+        print(f"\n{key} vs {keys[0]}: top-1 agreement {agree * 100:.1f}%, mean |confidence diff| {conf_diff:.3f}")
+        for (a, b), n in differ.most_common(5):
+            print(f"   {a} -> {b}: {n}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded session keypoints through the model path")
+    parser.add_argument("logs", nargs="+", help="session log files or directories")
+    parser.add_argument("--model", action="append", help="name[@version] from the registry, or a .pt/.pth path "
+                                                         "(repeat to compare; the first is the baseline)")
+    parser.add_argument("--registry", default=os.environ.get('MODEL_REGISTRY', 'models.json'))
+    parser.add_argument("--classes", default=DEFAULT_CLASSES, help="class_names.json for .pt/.pth models")
+    parser.add_argument("--speed", choices=["max", "original"], default="max")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="cap on idle gaps at original speed (s)")
+    parser.add_argument("--assume-layout", choices=LAYOUTS,
+                        help="hand slot layout of frames in logs that don't record it")
+    args = parser.parse_args()
+
+    files = log_files(args.logs)
+    if not files:
+        raise SystemExit("No session logs found")
+    models = args.model or [os.environ.get('MODEL_PATH', '../client/src/Assets/sign_model_mobile.pt')]
+    registry, keys = build_registry(models, args.registry, args.classes)
+    print(f"📌 {len(files)} log files, models: {', '.join(keys)}, speed: {args.speed}")
+    report(*replay(files, registry, keys, args.speed, args.max_gap, args.assume_layout), keys)
@@ -0,0 +1,137 @@
+import os
+import glob
+import time
+import struct
+import threading
+
+import numpy as np
+
+from hand_features import FEATURES, LAYOUTS
+
+# File layout: MAGIC, then records of
+#   kind (uint8) | wall time (float64) | len(session_id) (uint8) | len(model) (uint8)
+#   | hand slot layout (uint8, index into LAYOUTS; 255 for RESET)
+#   | session_id utf-8 | model utf-8 | FRAME only: 126 x float16 keypoints
+# Version 1 files (MAGIC_V1) have no layout byte; read_log reports their layout as None.
+MAGIC = b"SKPLOG2\n"
+MAGIC_V1 = b"SKPLOG1\n"
+FRAME, RESET = 0, 1
+_HEADER = struct.Struct("<BdBBB")
+_HEADER_V1 = struct.Struct("<BdBB")
+_NO_LAYOUT = 255
+_KEYPOINT_BYTES = FEATURES * 2
+
+
+class SessionLog:
+    """
+    Append-only log of the keypoint frames each session adds to its buffer,
+    plus buffer resets, for replay_sessions.py. Keypoints are stored as
+    float16 (~270 bytes per frame) with the hand slot layout they were
+    extracted in (the serving model's feature_layout). Files rotate at `max_bytes`; each process
+    (gunicorn worker) keeps its own newest `keep` files and removes files left
+    by processes that are gone, never another live worker's. Writes are
+    buffered, so a crash can lose the last few frames.
+    """
+
+    def __init__(self, log_dir, max_bytes=64 * 1024 ** 2, keep=10):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._opened = 0
+        os.makedirs(log_dir, exist_ok=True)
+
+    def frame(self, session_id, model, keypoints, layout):
+        self._write(FRAME, session_id, model, LAYOUTS.index(layout),
+                    np.asarray(keypoints, dtype=np.float16).tobytes())
+
+    def reset(self, session_id):
+        self._write(RESET, session_id, "", _NO_LAYOUT, b"")
+
+    def _write(self, kind, session_id, model, layout, payload):
+        sid, mdl = session_id.encode()[:255], model.encode()[:255]
+        record = _HEADER.pack(kind, time.time(), len(sid), len(mdl), layout) + sid + mdl + payload
+        with self._lock:
+            if self._file is None or self._size + len(record) > self.max_bytes:
+                self._rotate()
+            self._file.write(record)
+            self._size += len(record)
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.log_dir, f"session-{stamp}-{os.getpid()}-{self._opened}.skl")
+        self._opened += 1
+        self._file = open(path, "ab", buffering=64 * 1024)
+        self._file.write(MAGIC)
+        self._size = len(MAGIC)
+
+        own = sorted(glob.glob(os.path.join(self.log_dir, f"session-*-{os.getpid()}-*.skl")), key=os.path.getmtime)
+        for old in own[:-self.keep] + self._orphans():
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass  # another worker cleaned it up first
+
+    def _orphans(self):
+        """Log files whose writing process has exited (older than this one's newest `keep`)."""
+        orphans = []
+        for path in glob.glob(os.path.join(self.log_dir, "session-*.skl")):
+            try:
+                pid = int(os.path.basename(path).split("-")[3])
+            except (IndexError, ValueError):
+                continue
+            if pid != os.getpid() and not _alive(pid):
+                orphans.append(path)
+        # Keep the newest `keep` of them: they are the last record of a worker that restarted
+        return sorted(orphans, key=os.path.getmtime)[:-self.keep]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_log(path):
+    """
+    Yield (kind, wall time, session_id, model, layout, keypoints float32 or
+    None) records of one file. layout is None for RESET records and for
+    version 1 files, which did not record it.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic not in (MAGIC, MAGIC_V1):
+            raise ValueError(f"{path} is not a session log")
+        header_struct = _HEADER if magic == MAGIC else _HEADER_V1
+        while True:
+            header = f.read(header_struct.size)
+            if len(header) < header_struct.size:
+                return
+            kind, ts, sid_len, model_len, *code = header_struct.unpack(header)
+            layout = LAYOUTS[code[0]] if code and code[0] < len(LAYOUTS) else None
+            names = f.read(sid_len + model_len)
+            if len(names) < sid_len + model_len:
+                return  # truncated tail
+            keypoints = None
+            if kind == FRAME:
+                payload = f.read(_KEYPOINT_BYTES)
+                if len(payload) < _KEYPOINT_BYTES:
+                    return  # truncated tail
+                keypoints = np.frombuffer(payload, dtype=np.float16).astype(np.float32)
+            session_id = names[:sid_len].decode(errors="replace")
+            model = names[sid_len:].decode(errors="replace")
+            yield kind, ts, session_id, model, layout, keypoints
@@ -0,0 +1,94 @@
+import time
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from hand_features import normalize_landmarks, FEATURES
+
+# Frames a session needs before its window is worth a prediction
+MIN_FRAMES = 20
+
+
+def prepare_window(frames, seq_len):
+    """Buffered (126,) frames -> (normalized (seq_len, 126) window zero-padded at the end, true length)."""
+    sequence = np.array(frames[-seq_len:], dtype=np.float32).reshape(-1, FEATURES)
+    length = len(sequence)
+    if length < seq_len:
+        sequence = np.vstack([sequence, np.zeros((seq_len - length, FEATURES), dtype=np.float32)])
+    return normalize_landmarks(sequence), length
+
+
+class Session:
+    """Last `seq_len` keypoint frames of one client."""
+
+    def __init__(self, seq_len):
+        self.frames = deque(maxlen=seq_len)
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+
+    def append(self, keypoints):
+        """Add a frame; returns a snapshot of the buffered frames, oldest first."""
+        with self.lock:
+            self.frames.append(keypoints)
+            return list(self.frames)
+
+    def extend(self, frames):
+        """Add several frames in order, atomically; returns a snapshot like append()."""
+        with self.lock:
+            self.frames.extend(frames)
+            return list(self.frames)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.frames)
+
+    def reset(self):
+        with self.lock:
+            self.frames.clear()
+
+
+class SessionStore:
+    """
+    Per-client keypoint buffers keyed by the request's session_id, so
+    concurrent signers don't interleave frames in one window. Sessions idle
+    longer than `ttl_s` are dropped, and beyond `max_sessions` the least
+    recently used one goes. Buffers live in the worker process.
+    """
+
+    def __init__(self, seq_len, max_sessions=256, ttl_s=300):
+        self.seq_len = seq_len
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(self.seq_len)
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            self._expire(now)
+            return session
+
+    def _expire(self, now):
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - oldest.last_seen <= self.ttl_s:
+                break
+            del self._sessions[oldest_id]
+            self.expired += 1
+
+    def reset(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is not None:
+            session.reset()
+
+    def stats(self):
+        with self._lock:
+            return {'active': len(self._sessions), 'max_sessions': self.max_sessions, 'expired': self.expired}
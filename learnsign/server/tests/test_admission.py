@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from admission import AdmissionController, request_arrival
+
+
+def hold_slot(controller):
+    assert controller.acquire() is None
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_queue_full():
+    controller = AdmissionController(max_inflight=1, max_queue=1, max_wait_s=1.0, stale_after_s=2.0)
+    hold_slot(controller)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(controller.acquire()))
+    waiter.start()
+    wait_for(lambda: controller.waiting == 1)
+
+    assert controller.acquire() == 'queue_full'
+
+    controller.release()
+    waiter.join()
+    assert results == [None]
+    assert controller.stats()['shed_queue_full'] == 1
+
+
+def test_timeout():
+    controller = AdmissionController(max_inflight=1, max_queue=2, max_wait_s=0.05, stale_after_s=1.0)
+    hold_slot(controller)
+
+    assert controller.acquire() == 'timeout'
+    assert controller.stats()['shed_timeout'] == 1
+    assert controller.stats()['queue_depth'] == 0
+
+
+def test_stale_on_arrival():
+    controller = AdmissionController(max_inflight=1, max_queue=2, max_wait_s=0.05, stale_after_s=0.5)
+
+    assert controller.acquire(arrived_at=time.monotonic() - 1.0) == 'stale'
+    assert controller.stats()['dropped_stale'] == 1
+    assert controller.stats()['inflight'] == 0
+
+
+def test_stale_after_waiting_for_a_slot_releases_it():
+    controller = AdmissionController(max_inflight=1, max_queue=2, max_wait_s=0.5, stale_after_s=1.0)
+    hold_slot(controller)
+    threading.Timer(0.2, controller.release).start()
+
+    # Fresh enough on arrival, past the budget once the slot frees up
+    assert controller.acquire(arrived_at=time.monotonic() - 0.9) == 'stale'
+    assert controller.stats()['inflight'] == 0
+    assert controller.acquire() is None
+
+
+def test_budget_must_exceed_max_wait():
+    with pytest.raises(ValueError):
+        AdmissionController(max_wait_s=0.5, stale_after_s=0.5)
+
+
+@pytest.mark.parametrize("header", [lambda t: str(int(t * 1000)), lambda t: f"t={t:.3f}"])
+def test_request_arrival_from_proxy_header(header):
+    arrived = request_arrival({'X-Request-Start': header(time.time() - 2.0)})
+    assert time.monotonic() - arrived == pytest.approx(2.0, abs=0.1)
+
+
+def test_request_arrival_without_header_is_now():
+    assert time.monotonic() - request_arrival({}) < 0.1
+
+
+def test_limit_returns_503_with_retry_after():
+    controller = AdmissionController(max_inflight=1, max_queue=2, max_wait_s=0.05, stale_after_s=0.5,
+                                     retry_after_s=3)
+    app = Flask(__name__)
+    app.route('/work')(controller.limit(lambda: 'ok'))
+    client = app.test_client()
+
+    assert client.get('/work').data == b'ok'
+    stale = client.get('/work', headers={'X-Request-Start': str(int((time.time() - 5) * 1000))})
+    assert stale.status_code == 503
+    assert stale.headers['Retry-After'] == '3'
+    assert stale.get_json()['reason'] == 'stale'
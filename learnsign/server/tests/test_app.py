@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+pytest.importorskip("mediapipe")
+torch = pytest.importorskip("torch")
+
+SERVER = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, SERVER)
+
+
+@pytest.fixture(scope="module")
+def client():
+    cwd = os.getcwd()
+    os.chdir(SERVER)  # MODEL_PATH and CLASS_NAMES_PATH defaults are relative to the server
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("keypoints, message", [
+    ([0.5] * 125, "shape"),
+    ([[0.5] * 126], "shape"),
+    (["a"] * 126, "numbers"),
+    ([0.5] * 125 + [None], "numbers"),
+    ([0.5] * 125 + [float("nan")], "finite"),
+    ("0.5", "numbers"),
+])
+def test_predict_rejects_malformed_keypoints(client, keypoints, message):
+    response = client.post("/api/predict", json={"keypoints": keypoints, "session_id": "bad"})
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("keypoints, message", [
+    ([[0.5] * 126, [0.5] * 125], "shape"),
+    ([[0.5] * 126, ["a"] * 126], "numbers"),
+    ({"frame": [0.5] * 126}, "list"),
+])
+def test_burst_rejects_malformed_keypoints(client, keypoints, message):
+    response = client.post("/api/predict_burst", json={"keypoints": keypoints, "session_id": "bad"})
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+def test_predict_accepts_keypoints(client):
+    response = client.post("/api/predict", json={"keypoints": [0.5] * 126, "session_id": "good"})
+    assert response.status_code == 200
+    assert response.get_json()["success"] is False  # collecting frames
@@ -0,0 +1,46 @@
+import os
+import sys
+import filecmp
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+SERVER = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, SERVER)
+from hand_features import landmarks_to_array, _fake_results, FEATURE_LAYOUT, LEGACY_LAYOUT
+
+REPO = os.path.join(SERVER, "..", "..")
+SHIPPED_MODEL = os.path.join(SERVER, "..", "client", "src", "Assets", "sign_model_mobile.pt")
+
+
+def test_copies_are_identical():
+    # The server deploys on its own, so it carries a copy of the training-side module
+    assert filecmp.cmp(os.path.join(SERVER, "hand_features.py"),
+                       os.path.join(REPO, "sign-language", "scripts", "hand_features.py"), shallow=False)
+
+
+def test_layouts_differ_only_in_slot_order():
+    results = _fake_results(2)  # detected right hand first, then left
+    by_hand = landmarks_to_array(results, layout=FEATURE_LAYOUT)
+    by_detection = landmarks_to_array(results, layout=LEGACY_LAYOUT)
+    assert np.array_equal(by_hand[0], by_detection[1])
+    assert np.array_equal(by_hand[1], by_detection[0])
+
+
+def test_single_hand_slot():
+    results = _fake_results(1)  # one right hand
+    assert not landmarks_to_array(results, layout=FEATURE_LAYOUT)[0].any()
+    assert not landmarks_to_array(results, layout=LEGACY_LAYOUT)[1].any()
+
+
+def test_unknown_layout_rejected():
+    with pytest.raises(ValueError):
+        landmarks_to_array(_fake_results(1), layout="mirrored")
+
+
+def test_shipped_model_uses_detection_order():
+    pytest.importorskip("torch")
+    from model_registry import load_model_with_layout
+    _, layout = load_model_with_layout(SHIPPED_MODEL, "cpu")
+    assert layout == LEGACY_LAYOUT
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("simplejpeg")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import image_decode
+from image_decode import decode_rgb, REDUCED_FLAGS
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return (np.random.default_rng(0).random((1080, 1921, 3)) * 255).astype(np.uint8)
+
+
+def encode(frame, ext=".jpg"):
+    return cv2.imencode(ext, frame)[1].tobytes()
+
+
+@pytest.mark.parametrize("factor", [1, 2, 4, 8])
+def test_matches_opencv_reduced_decode(frame, factor):
+    data = encode(frame)
+    expected = cv2.cvtColor(cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_FLAGS[factor]), cv2.COLOR_BGR2RGB)
+    assert np.array_equal(decode_rgb(data, factor=factor), expected)
+
+
+def test_target_side_picks_factor(frame):
+    assert decode_rgb(encode(frame), target_side=480).shape == (270, 481, 3)
+
+
+def test_decodes_into_reused_thread_buffer(frame):
+    data = encode(frame)
+    first = decode_rgb(data, factor=2)
+    buffer = image_decode._local.buf
+    second = decode_rgb(data, factor=4)
+    assert image_decode._local.buf is buffer
+    assert np.shares_memory(first, buffer) and np.shares_memory(second, buffer)
+
+
+def test_png_falls_back_to_opencv(frame):
+    small = frame[:48, :64]
+    assert np.array_equal(decode_rgb(encode(small, ".png")), small[..., ::-1])
+
+
+def test_garbage_raises():
+    with pytest.raises(ValueError):
+        decode_rgb(b"not an image")
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import time
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import model_registry
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Registry of two fake models; loading 'slow' takes 0.5 s."""
+    loads = []
+
+    def fake_load(path, device, layout=None):
+        loads.append(path)
+        if path.endswith("slow.pt"):
+            time.sleep(0.5)
+        return torch.nn.Linear(2, 2), layout or "handedness"
+
+    monkeypatch.setattr(model_registry, "load_model_with_layout", fake_load)
+    class_names = tmp_path / "classes.json"
+    class_names.write_text(json.dumps(["a", "b"]))
+    specs = [{'name': name, 'version': '1', 'path': str(tmp_path / f"{name}.pt"), 'class_names': str(class_names)}
+             for name in ("fast", "slow")]
+    registry = ModelRegistry(specs)
+    registry.loads = loads
+    return registry
+
+
+def test_cold_load_does_not_block_loaded_models(registry):
+    registry.get()  # default 'fast'
+    loader = threading.Thread(target=registry.get, args=("slow",))
+    loader.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    assert registry.get().key == "fast@1"
+    assert time.perf_counter() - start < 0.1
+    loader.join()
+
+
+def test_concurrent_requests_share_one_load(registry):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(r) for r in results}) == 1
+    assert sum(p.endswith("slow.pt") for p in registry.loads) == 1
+    assert registry.stats()['models']['slow@1']['loads'] == 1
+
+
+def test_failed_load_is_retried(registry, monkeypatch):
+    def broken(path, device, layout=None):
+        raise RuntimeError("corrupt file")
+
+    good = model_registry.load_model_with_layout
+    monkeypatch.setattr(model_registry, "load_model_with_layout", broken)
+    with pytest.raises(RuntimeError):
+        registry.get("slow")
+
+    monkeypatch.setattr(model_registry, "load_model_with_layout", good)
+    assert registry.get("slow").key == "slow@1"
+
+
+def test_record_counts_cache_hits_apart_from_forward_passes(registry):
+    registry.get()
+    registry.get("slow")  # now the most recently used
+    registry.record("fast@1", 0.004)
+    registry.record("fast@1")
+    registry.record("fast@1")
+
+    stats = registry.stats()['models']['fast@1']
+    assert (stats['requests'], stats['cache_hits']) == (3, 2)
+    assert stats['forward_ms_mean'] == 4.0
+    assert list(registry._loaded)[-1] == "fast@1"  # a cache hit refreshes LRU recency
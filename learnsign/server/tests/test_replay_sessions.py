@@ -0,0 +1,47 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from session_log import SessionLog
+from sessions import MIN_FRAMES
+from replay_sessions import replay
+
+
+class FakeRegistry:
+    def __init__(self, layouts):
+        self.entries = {key: SimpleNamespace(key=key, feature_layout=layout,
+                                             predict=lambda sequence, length: ("hello", 1.0, []))
+                        for key, layout in layouts.items()}
+
+    def get(self, key):
+        return self.entries[key]
+
+
+def write_log(log_dir, layouts):
+    log = SessionLog(str(log_dir))
+    for layout in layouts:
+        log.frame("alice", "asl6@1", np.ones(126, dtype=np.float32), layout)
+    log.close()
+    return sorted(str(p) for p in log_dir.glob("*.skl"))
+
+
+def test_models_with_different_layouts_are_not_compared(tmp_path):
+    files = write_log(tmp_path, ["detection"] * MIN_FRAMES)
+    registry = FakeRegistry({"asl6@1": "detection", "asl6@2-student": "handedness"})
+    with pytest.raises(SystemExit, match="different hand slot layouts"):
+        replay(files, registry, ["asl6@1", "asl6@2-student"])
+
+
+def test_frames_in_another_layout_are_skipped(tmp_path):
+    files = write_log(tmp_path, ["detection"] * 3 + ["handedness"] * MIN_FRAMES)
+    registry = FakeRegistry({"asl6@2-student": "handedness"})
+    frames, n_sessions, predictions, _, _, skipped = replay(files, registry, ["asl6@2-student"])
+    assert frames == MIN_FRAMES
+    assert skipped == {"detection": 3}
+    assert len(predictions["asl6@2-student"]) == 1
@@ -0,0 +1,81 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from session_log import SessionLog, read_log, FRAME, RESET, MAGIC_V1, _HEADER_V1
+
+
+def write_log(log_dir):
+    log = SessionLog(str(log_dir))
+    log.frame("alice", "asl6@1", np.ones(126, dtype=np.float32), "detection")
+    log.reset("alice")
+    log.close()
+    (path,) = log_dir.glob("*.skl")
+    return path
+
+
+def test_round_trip(tmp_path):
+    records = list(read_log(write_log(tmp_path)))
+    assert [(kind, sid, model, layout) for kind, _, sid, model, layout, _ in records] == [
+        (FRAME, "alice", "asl6@1", "detection"), (RESET, "alice", "", None)]
+    assert records[0][5].tolist() == [1.0] * 126
+
+
+def test_version_1_logs_read_without_layout(tmp_path):
+    path = tmp_path / "old.skl"
+    path.write_bytes(MAGIC_V1 + _HEADER_V1.pack(FRAME, 0.0, 5, 0) + b"alice"
+                     + np.ones(126, dtype=np.float16).tobytes())
+    ((kind, _, sid, _, layout, keypoints),) = read_log(path)
+    assert (kind, sid, layout) == (FRAME, "alice", None)
+    assert keypoints.tolist() == [1.0] * 126
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5, 13])
+def test_truncated_tail_stops_cleanly(tmp_path, cut):
+    path = write_log(tmp_path)
+    data = path.read_bytes()
+    path.write_bytes(data[:-cut])  # cuts into the 17-byte RESET record (names, then header)
+    records = list(read_log(path))
+    assert [(kind, sid) for kind, _, sid, _, _, _ in records] == [(FRAME, "alice")]
+
+
+def dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_rotation_spares_live_workers_files(tmp_path):
+    other_live = tmp_path / f"session-20260101-000000-{os.getppid()}-0.skl"
+    orphan = tmp_path / f"session-20260101-000000-{dead_pid()}-0.skl"
+    for path in (other_live, orphan):
+        path.write_bytes(b"SKPLOG1\n")
+
+    log = SessionLog(str(tmp_path), max_bytes=300, keep=1)
+    for _ in range(5):
+        log.frame("alice", "asl6@1", np.zeros(126, dtype=np.float32), "handedness")  # ~280 bytes: one file each
+    log.close()
+
+    own = list(tmp_path.glob(f"session-*-{os.getpid()}-*.skl"))
+    assert len(own) == 1
+    assert other_live.exists()
+    assert orphan.exists()  # the newest `keep` files of a gone worker are kept
+
+
+def test_orphans_beyond_keep_are_removed(tmp_path):
+    pid = dead_pid()
+    orphans = [tmp_path / f"session-20260101-00000{i}-{pid}-{i}.skl" for i in range(3)]
+    for i, path in enumerate(orphans):
+        path.write_bytes(b"SKPLOG1\n")
+        os.utime(path, (1000 + i, 1000 + i))
+
+    log = SessionLog(str(tmp_path), keep=1)
+    log.frame("alice", "asl6@1", np.zeros(126, dtype=np.float32), "handedness")
+    log.close()
+
+    assert [p.exists() for p in orphans] == [False, False, True]
@@ -0,0 +1,54 @@
+import os
+import queue
+import threading
+import torch
+
+
+def _snapshot(obj):
+    """Detached CPU copies of every tensor, so training can keep updating the originals."""
+    if torch.is_tensor(obj):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: _snapshot(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_snapshot(v) for v in obj)
+    return obj
+
+
+class BackgroundCheckpointWriter:
+    """
+    torch.save on a worker thread. Each checkpoint is written to <path>.tmp and
+    renamed over <path>, so a crash mid-write never leaves a truncated file.
+    At most `max_pending` snapshots are held in memory; beyond that save() waits.
+    """
+
+    def __init__(self, max_pending=2):
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def save(self, state, path):
+        if self.error is not None:
+            raise RuntimeError(f"Checkpoint writer failed: {self.error}")
+        self.pending.put((_snapshot(state), path))
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            state, path = item
+            try:
+                tmp = path + ".tmp"
+                torch.save(state, tmp)
+                os.replace(tmp, path)
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        """Wait for every queued checkpoint to be on disk."""
+        self.pending.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError(f"Checkpoint writer failed: {self.error}")
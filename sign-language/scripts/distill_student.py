@@ -0,0 +1,145 @@
+import os
+import time
+import tempfile
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+from typing import Optional
+from tqdm import tqdm
+
+from export_model import export_dynamic
+from hand_features import FEATURE_LAYOUT
+from train_model import (build_loaders, load_checkpoint_model, export_torchscript,
+                         measure_latency, seed_everything, evaluate, INPUT_SIZE, SAVE_PTH, DEVICE)
+
+# ---------------- CONFIG ---------------- #
+TEACHER_PTH = SAVE_PTH
+STUDENT_PTH = "models/sign_model_student.pth"
+STUDENT_TORCHSCRIPT = "models/sign_model_student.pt"  # loadable by app.py like sign_model_mobile.pt
+CHANNELS = 64
+DILATIONS = (1, 2, 4, 8)
+EPOCHS = 60
+LR = 2e-3
+TEMPERATURE = 4.0
+ALPHA = 0.7  # weight of the soft teacher targets vs the hard labels
+
+
+class TemporalBlock(nn.Module):
+    def __init__(self, channels, dilation, dropout):
+        super().__init__()
+        self.conv = nn.Conv1d(channels, channels, kernel_size=3, padding=dilation, dilation=dilation)
+        self.bn = nn.BatchNorm1d(channels)
+        self.dropout = nn.Dropout(dropout)
+
+    def forward(self, x):
+        return x + self.dropout(F.relu(self.bn(self.conv(x))))
+
+
+class TemporalConvStudent(nn.Module):
+    """
+    1D temporal-convolution classifier: every frame is processed in parallel,
+    unlike the LSTM recurrence. Same forward(x, lengths) contract as BiLSTMAttn.
+    """
+
+    def __init__(self, input_size, num_classes, channels=CHANNELS, dilations=DILATIONS, dropout=0.2):
+        super().__init__()
+        self.inp = nn.Sequential(
+            nn.Conv1d(input_size, channels, kernel_size=1),
+            nn.BatchNorm1d(channels),
+            nn.ReLU(),
+        )
+        self.blocks = nn.Sequential(*[TemporalBlock(channels, d, dropout) for d in dilations])
+        self.fc = nn.Linear(channels, num_classes)
+
+    def forward(self, x, lengths: Optional[torch.Tensor] = None):
+        # x: (B, T, F) -> (B, C, T)
+        h = self.blocks(self.inp(x.transpose(1, 2)))
+        if lengths is None:
+            pooled = h.mean(dim=2)
+        else:
+            # Mean over real frames only
+            mask = (torch.arange(x.size(1), device=x.device)[None, :] < lengths.to(x.device)[:, None]).to(h.dtype)
+            pooled = (h * mask.unsqueeze(1)).sum(dim=2) / mask.sum(dim=1, keepdim=True).clamp(min=1)
+        return self.fc(pooled)
+
+
+def distill(teacher, student, train_loader, test_loader, class_names, epochs=EPOCHS):
+    seed_everything()
+    teacher.to(DEVICE).eval()
+    student.to(DEVICE)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.AdamW(student.parameters(), lr=LR, weight_decay=1e-4)
+    scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=epochs)
+
+    best_acc = 0.0
+    for epoch in range(1, epochs + 1):
+        student.train()
+        for X, y, lengths in tqdm(train_loader, desc=f"Distill {epoch}/{epochs}"):
+            X, y = X.to(DEVICE), y.to(DEVICE)
+            with torch.no_grad():
+                soft_targets = F.softmax(teacher(X, lengths) / TEMPERATURE, dim=1)
+            logits = student(X, lengths)
+            soft_loss = F.kl_div(F.log_softmax(logits / TEMPERATURE, dim=1), soft_targets,
+                                 reduction="batchmean") * TEMPERATURE ** 2
+            loss = ALPHA * soft_loss + (1 - ALPHA) * criterion(logits, y)
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        scheduler.step()
+
+        val_acc, val_loss = evaluate(student, test_loader, criterion)
+        print(f"Epoch {epoch:3d} | Val Loss: {val_loss:.4f} | Val Acc: {val_acc*100:.2f}%")
+        if val_acc >= best_acc:
+            best_acc = val_acc
+            torch.save({
+                'epoch': epoch,
+                'model_state_dict': student.state_dict(),
+                'val_acc': val_acc,
+                'class_names': class_names,
+                'architecture': 'TemporalConvStudent',
+                'feature_layout': FEATURE_LAYOUT,
+            }, STUDENT_PTH)
+
+    student.load_state_dict(torch.load(STUDENT_PTH, map_location=DEVICE)['model_state_dict'])
+    return best_acc
+
+
+def compare(models, test_loader):
+    """Accuracy and TorchScript latency at batch 1 / 32 for each (name, eager model)."""
+    criterion = nn.CrossEntropyLoss()
+    rows = []
+    for name, model in models:
+        model.to(DEVICE).eval()
+        acc, _ = evaluate(model, test_loader, criterion)
+        with tempfile.TemporaryDirectory() as tmp:
+            # The verified export is what the server actually runs
+            scripted = export_dynamic(model, os.path.join(tmp, "model.pt"), input_size=INPUT_SIZE)
+        rows.append((name, sum(p.numel() for p in model.parameters()), acc,
+                     measure_latency(scripted, batch=1), measure_latency(scripted, batch=32)))
+
+    print(f"\n{'model':<10}{'params':>10}{'acc':>9}{'b1 ms':>9}{'b32 ms':>9}{'b32 clips/s':>13}")
+    for name, params, acc, b1, b32 in rows:
+        print(f"{name:<10}{params:>10,}{acc*100:>8.2f}%{b1:>9.2f}{b32:>9.2f}{32000 / b32:>13.0f}")
+
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(STUDENT_PTH), exist_ok=True)
+    train_ds, test_ds, train_loader, test_loader = build_loaders()
+    teacher, class_names = load_checkpoint_model(TEACHER_PTH)
+    if class_names != train_ds.classes:
+        raise ValueError(f"Teacher classes {class_names} don't match the dataset {train_ds.classes}")
+    if teacher.feature_layout != FEATURE_LAYOUT:
+        raise ValueError(f"Teacher was trained on {teacher.feature_layout} hand slots, the dataset "
+                         f"uses {FEATURE_LAYOUT}: retrain it before distilling")
+
+    student = TemporalConvStudent(INPUT_SIZE, len(class_names))
+    start = time.perf_counter()
+    best_acc = distill(teacher, student, train_loader, test_loader, class_names)
+    print(f"\n🎉 Distillation finished in {time.perf_counter() - start:.0f}s, best val acc {best_acc*100:.2f}%")
+
+    compare([("teacher", teacher), ("student", student)], test_loader)
+
+    print("\n📱 Exporting student to TorchScript...")
+    export_torchscript(student, STUDENT_TORCHSCRIPT)
@@ -0,0 +1,104 @@
+import json
+import time
+import argparse
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+
+from train_model import (KeypointDataset, load_checkpoint_model, measure_latency,
+                         INPUT_SIZE, SAVE_TORCHSCRIPT, CLASS_NAMES_JSON, KEYPOINT_STORE)
+
+
+def load_any_model(path, class_names_json=CLASS_NAMES_JSON):
+    """
+    TorchScript export (.pt) or training checkpoint (.pth).
+    Returns (model, class names, whether forward takes lengths).
+    """
+    if path.endswith(".pth"):
+        checkpoint = torch.load(path, map_location="cpu")
+        if checkpoint.get("architecture") == "TemporalConvStudent":
+            from distill_student import TemporalConvStudent
+            state = checkpoint["model_state_dict"]
+            model = TemporalConvStudent(INPUT_SIZE, len(checkpoint["class_names"]),
+                                        channels=state["fc.weight"].shape[1])
+            model.load_state_dict(state)
+            return model.eval(), checkpoint["class_names"], True
+        model, class_names = load_checkpoint_model(path)
+        return model, class_names, True
+
+    model = torch.jit.load(path, map_location="cpu")
+    model.eval()
+    with open(class_names_json) as f:
+        class_names = json.load(f)
+    return model, class_names, len(model.forward.schema.arguments) > 2
+
+
+def run(model, loader, takes_lengths, num_classes, label_map):
+    """Stream the split through the model; returns (confusion matrix, seconds spent in forward)."""
+    confusion = np.zeros((num_classes, num_classes), dtype=np.int64)
+    forward_s = 0.0
+    with torch.no_grad():
+        for X, y, lengths in loader:
+            start = time.perf_counter()
+            logits = model(X, lengths) if takes_lengths else model(X)
+            forward_s += time.perf_counter() - start
+            preds = logits.argmax(dim=1).numpy()
+            np.add.at(confusion, (label_map[y.numpy()], preds), 1)
+    return confusion, forward_s
+
+
+def print_report(class_names, confusion, n, wall_s, forward_s, latency_ms):
+    accuracy = np.trace(confusion) / max(1, n)
+    print(f"\nSamples: {n} | Accuracy: {accuracy*100:.2f}%")
+    print(f"Throughput: {n / wall_s:.1f} samples/s end-to-end, {n / max(forward_s, 1e-9):.1f} samples/s model only")
+    print(f"Batch-1 latency: {latency_ms:.2f} ms")
+
+    width = max(6, max(len(c) for c in class_names) + 1)
+    print("\nConfusion matrix (rows: true, cols: predicted)")
+    print(" " * width + "".join(f"{c[:width - 1]:>{width}}" for c in class_names) + f"{'recall':>8}")
+    for i, c in enumerate(class_names):
+        recall = confusion[i, i] / max(1, confusion[i].sum())
+        print(f"{c:<{width}}" + "".join(f"{v:>{width}}" for v in confusion[i]) + f"{recall*100:>7.1f}%")
+    return accuracy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched offline evaluation of an exported model")
+    parser.add_argument("model", nargs="?", default=SAVE_TORCHSCRIPT, help=".pt (TorchScript) or .pth (checkpoint)")
+    parser.add_argument("--classes", default=CLASS_NAMES_JSON, help="class_names.json for TorchScript models")
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--store", default=KEYPOINT_STORE, help="read clips from this keypoint_store.py directory")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args()
+
+    model, class_names, takes_lengths = load_any_model(args.model, args.classes)
+    ds = KeypointDataset(args.split, args.store)
+    missing = sorted(set(ds.classes) - set(class_names))
+    if missing:
+        raise ValueError(f"Model doesn't know classes {missing}")
+    # Dataset label index -> model output index, in case the orders differ
+    label_map = np.array([class_names.index(c) for c in ds.classes])
+
+    loader = DataLoader(ds, batch_size=args.batch_size, num_workers=args.workers)
+    start = time.perf_counter()
+    confusion, forward_s = run(model, loader, takes_lengths, len(class_names), label_map)
+    wall_s = time.perf_counter() - start
+    latency_ms = measure_latency(model, batch=1, with_lengths=takes_lengths)
+
+    accuracy = print_report(class_names, confusion, len(ds), wall_s, forward_s, latency_ms)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "model": args.model,
+                "split": args.split,
+                "samples": len(ds),
+                "accuracy": accuracy,
+                "samples_per_sec": len(ds) / wall_s,
+                "model_samples_per_sec": len(ds) / max(forward_s, 1e-9),
+                "batch1_latency_ms": latency_ms,
+                "classes": class_names,
+                "confusion": confusion.tolist(),
+            }, f, indent=2)
+        print(f"\nSaved report to {args.out}")
@@ -0,0 +1,115 @@
+import os
+import json
+import argparse
+import torch
+
+from hand_features import FEATURE_LAYOUT, LAYOUTS
+
+# ---------------- CONFIG ---------------- #
+INPUT_SIZE = 126
+MAX_SEQ_LEN = 40
+# Shapes the exported model must reproduce the eager model on: every batch size
+# with every window length T, full-length and ragged `lengths` alike. Covers
+# batched serving (B > 1), short buffers (T < MAX_SEQ_LEN) and padded windows.
+BATCH_SIZES = (1, 2, 8, 32)
+SEQ_LENS = (1, 5, 20, 39, 40)
+TOLERANCE = 1e-4
+
+
+def shape_grid(batch_sizes=BATCH_SIZES, seq_lens=SEQ_LENS, input_size=INPUT_SIZE, seed=0):
+    """(x, lengths) test inputs; the first clip of each batch always spans the full window."""
+    gen = torch.Generator().manual_seed(seed)
+    for B in batch_sizes:
+        for T in seq_lens:
+            x = torch.randn(B, T, input_size, generator=gen)
+            yield x, torch.full((B,), T, dtype=torch.long)
+            if B > 1 or T > 1:
+                ragged = torch.randint(1, T + 1, (B,), generator=gen)
+                ragged[0] = T
+                yield x, ragged
+
+
+def verify(exported, eager, grid, tolerance=TOLERANCE):
+    """Failures as [(shape, lengths, max |diff| or error message)]; empty if every shape matches."""
+    failures = []
+    with torch.no_grad():
+        for x, lengths in grid:
+            try:
+                diff = (exported(x, lengths) - eager(x, lengths)).abs().max().item()
+            except Exception as e:
+                failures.append((tuple(x.shape), lengths.tolist(), f"{type(e).__name__}: {str(e).splitlines()[0]}"))
+                continue
+            if not diff <= tolerance:
+                failures.append((tuple(x.shape), lengths.tolist(), diff))
+    return failures
+
+
+def _trace(model, input_size):
+    example = (torch.randn(1, MAX_SEQ_LEN, input_size), torch.tensor([MAX_SEQ_LEN]))
+    return torch.jit.trace(model, example, check_trace=False)
+
+
+def _script(model, input_size):
+    return torch.jit.script(model)
+
+
+BUILDERS = {"trace": _trace, "script": _script}
+
+
+def export_dynamic(model, path, input_size=INPUT_SIZE, tolerance=TOLERANCE,
+                   batch_sizes=BATCH_SIZES, seq_lens=SEQ_LENS, methods=("trace", "script"),
+                   feature_layout=FEATURE_LAYOUT):
+    """
+    Export forward(x, lengths) for dynamic batch size and window length.
+
+    Tries torch.jit.trace first (fastest artifact), then torch.jit.script when
+    the trace baked in a shape; each candidate is optimized for inference,
+    saved, reloaded and checked against the eager model on the shape grid
+    (batch_sizes x seq_lens, full and ragged lengths; other shapes are not
+    checked). feature_layout is the hand slot layout the model was trained on,
+    recorded in export.json for the server. Returns the loaded artifact and
+    raises if no method passes.
+    """
+    if feature_layout not in LAYOUTS:
+        raise ValueError(f"Unknown feature layout {feature_layout!r}, expected one of {LAYOUTS}")
+    model = model.eval().cpu()
+    grid = list(shape_grid(batch_sizes, seq_lens, input_size))
+    for method in methods:
+        build = BUILDERS[method]
+        try:
+            exported = torch.jit.optimize_for_inference(build(model, input_size))
+        except Exception as e:
+            print(f"⚠️ {method} export failed: {e}")
+            continue
+
+        tmp = path + ".tmp"
+        report = {"method": method, "batch_sizes": list(batch_sizes), "seq_lens": list(seq_lens),
+                  "tolerance": tolerance, "feature_layout": feature_layout}
+        exported.save(tmp, _extra_files={"export.json": json.dumps(report)})
+        loaded = torch.jit.load(tmp, map_location="cpu")
+        failures = verify(loaded, model, grid, tolerance)
+        if not failures:
+            os.replace(tmp, path)
+            print(f"✅ {method} export verified on {len(grid)} shapes "
+                  f"(batch {list(batch_sizes)} x length {list(seq_lens)})")
+            return loaded
+
+        os.remove(tmp)
+        print(f"⚠️ {method} export differs from eager on {len(failures)}/{len(grid)} shapes, e.g.:")
+        for shape, lengths, diff in failures[:3]:
+            print(f"   {shape} lengths={lengths[:4]}: {diff}")
+    raise RuntimeError("No export matched the eager model on every shape")
+
+
+if __name__ == "__main__":
+    from train_model import load_checkpoint_model, SAVE_PTH, SAVE_TORCHSCRIPT
+
+    parser = argparse.ArgumentParser(description="Export a checkpoint for dynamic batch size and length")
+    parser.add_argument("checkpoint", nargs="?", default=SAVE_PTH)
+    parser.add_argument("--out", default=SAVE_TORCHSCRIPT)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    model, class_names = load_checkpoint_model(args.checkpoint)
+    export_dynamic(model, args.out, tolerance=args.tolerance, feature_layout=model.feature_layout)
+    print(f"✅ Saved {args.out} ({len(class_names)} classes, {model.feature_layout} hand slots)")
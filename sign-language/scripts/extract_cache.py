@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import inspect
+import hashlib
+import numpy as np
+
+CACHE_DIR = ".cache/keypoints"
+CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+# Once past CACHE_MAX_BYTES, least-recently-used entries go until this fraction is left
+EVICT_TO = 0.9
+
+
+def source_digest(*functions):
+    """
+    sha256 of the functions' source code. In the extractor params it ties the
+    cache to the code that produces the keypoints: any edit to it, comments
+    included, starts a new key space.
+    """
+    h = hashlib.sha256()
+    for fn in functions:
+        h.update(inspect.getsource(fn).encode())
+    return h.hexdigest()
+
+
+def _sha256_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Keypoint sequences cached under sha256(video content, extractor params).
+    params should cover everything the output depends on: settings, library
+    versions and source_digest() of the extraction code. Video hashes are
+    memoized by (size, mtime), so a lookup for an unchanged file is a stat()
+    and a file open. Whenever a put() takes the cache past max_bytes, entries
+    are evicted least-recently-used down to EVICT_TO of it.
+    """
+
+    def __init__(self, params, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.params = dict(params)
+        blob = json.dumps(self.params, sort_keys=True).encode()
+        self.params_digest = hashlib.sha256(blob).hexdigest()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, "video_hashes.json")
+        self.video_hashes = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.video_hashes = json.load(f)
+
+        self.hits = []
+        self.misses = []
+        self.evicted = 0
+        self.size_bytes = sum(size for _, size, _ in self._entries())
+
+    def video_hash(self, path):
+        st = os.stat(path)
+        abspath = os.path.abspath(path)
+        known = self.video_hashes.get(abspath)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        digest = _sha256_file(path)
+        self.video_hashes[abspath] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def key(self, video_path):
+        return hashlib.sha256((self.video_hash(video_path) + self.params_digest).encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def get(self, video_path):
+        entry = self._entry_path(self.key(video_path))
+        if not os.path.exists(entry):
+            self.misses.append(video_path)
+            return None
+        os.utime(entry)  # mtime doubles as the LRU timestamp
+        self.hits.append(video_path)
+        return np.load(entry)
+
+    def put(self, video_path, seq):
+        entry = self._entry_path(self.key(video_path))
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp = entry + ".tmp.npy"
+        np.save(tmp, seq)
+        replaced = os.path.getsize(entry) if os.path.exists(entry) else 0
+        os.replace(tmp, entry)
+        self.size_bytes += os.path.getsize(entry) - replaced
+        if self.size_bytes > self.max_bytes:
+            self.evicted += self.evict(int(self.max_bytes * EVICT_TO))
+
+    def _entries(self):
+        """(mtime ns, size, path) of every cached sequence."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for f in files:
+                if f.endswith(".npy") and not f.endswith(".tmp.npy"):
+                    p = os.path.join(root, f)
+                    st = os.stat(p)
+                    entries.append((st.st_mtime_ns, st.st_size, p))
+        return entries
+
+    def evict(self, target_bytes=None):
+        """Delete least-recently-used entries until the cache fits in target_bytes (default max_bytes)."""
+        target_bytes = self.max_bytes if target_bytes is None else target_bytes
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, p in sorted(entries):
+            if total <= target_bytes:
+                break
+            os.remove(p)
+            total -= size
+            evicted += 1
+        self.size_bytes = total
+        return evicted
+
+    def close(self):
+        """Persist the hash index, evict, and return a hit/miss report."""
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.video_hashes, f)
+        os.replace(tmp, self.index_path)
+
+        return {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "params": self.params,
+            "hits": len(self.hits),
+            "misses": len(self.misses),
+            "evicted": self.evicted + self.evict(),
+            "missed_files": self.misses,
+        }
@@ -1,82 +1,128 @@
 import os
 import cv2
+import json
 import numpy as np
 import mediapipe as mp
 
+from split_data import MANIFEST, read_manifest, keypoint_path
+from extract_cache import ExtractionCache, source_digest
+from scan_dataset import save_clip
+from hand_features import landmarks_to_array, sample_indices, HANDS, LANDMARKS, COORDS, FEATURES
+
 INPUT_DIR = "keypoints_6"
 CLASS_DIRS = ["train", "test"]
 SEQ_LEN = 40
-
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
+# "uniform": SEQ_LEN frames spread evenly over the whole clip; skipped frames
+# are only grab()bed (no retrieve/colour conversion, no landmarking).
+# "head": the first SEQ_LEN frames, as older datasets were extracted.
+SAMPLE_MODE = "uniform"
+HANDS_PARAMS = dict(
     max_num_hands=2,
     model_complexity=1,
     min_detection_confidence=0.4,
     min_tracking_confidence=0.4
 )
+# Results are cached per (video content, HANDS_PARAMS, SEQ_LEN, SAMPLE_MODE, MediaPipe and
+# OpenCV versions, source of the extraction code: see cache_params), so changing any of
+# them only re-extracts under the new key.
+USE_CACHE = True
+REPORT_PATH = "extract_report.json"
 
+mp_hands = mp.solutions.hands
 
-def extract_frame_keypoints(results):
-    points = []
-    
-    if results.multi_hand_landmarks:
-        hands_found = results.multi_hand_landmarks
-        # If 2 hands found
-        if len(hands_found) == 2:
-            for lm in hands_found[0].landmark:
-                points.extend([lm.x, lm.y, lm.z])
-            for lm in hands_found[1].landmark:
-                points.extend([lm.x, lm.y, lm.z])
-        else:  
-            # Only 1 → Pad other hand with zeros
-            for lm in hands_found[0].landmark:
-                points.extend([lm.x, lm.y, lm.z])
-            points.extend([0]*63)
-    else:
-        # No hands detected → all zeros
-        points.extend([0]*126)
-
-    return np.array(points, dtype=np.float32)
-
-
-for split in CLASS_DIRS:
-    print(f"\n📌 Processing: {split}")
-    
-    for cls in os.listdir(os.path.join(INPUT_DIR, split)):
-        cls_dir = os.path.join(INPUT_DIR, split, cls)
-        out_dir = os.path.join("keypoints_np", split, cls)
-
-        os.makedirs(out_dir, exist_ok=True)
-
-        for file in os.listdir(cls_dir):
-            if not file.endswith(".mp4"):
-                continue
-
-            video_path = os.path.join(cls_dir, file)
-            cap = cv2.VideoCapture(video_path)
-            seq = []
-
-            while len(seq) < SEQ_LEN:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = hands.process(frame_rgb)
-
-                keypoints = extract_frame_keypoints(results)
-                seq.append(keypoints)
-
-            cap.release()
-            
-            seq = np.array(seq)
-            if seq.shape[0] < SEQ_LEN:
-                pad = np.zeros((SEQ_LEN - seq.shape[0], 126))
-                seq = np.vstack((seq, pad))
-
-            np.save(os.path.join(out_dir, file.replace(".mp4", ".npy")), seq)
-
-    print(f"✅ Done {split}")
 
-hands.close()
-print("\n✅ Extraction completed successfully!")
+def list_jobs():
+    """(video, output .npy) pairs. With a split manifest every video is
+    extracted once into CLIP_KEYPOINT_DIR, whatever split it belongs to;
+    otherwise the old keypoints_6/<split>/<class> tree is walked."""
+    if os.path.exists(MANIFEST):
+        rows = read_manifest(MANIFEST)
+        return [(r["path"], keypoint_path(r)) for r in rows if r["path"].endswith(".mp4")]
+
+    jobs = []
+    for split in CLASS_DIRS:
+        for cls in os.listdir(os.path.join(INPUT_DIR, split)):
+            cls_dir = os.path.join(INPUT_DIR, split, cls)
+            out_dir = os.path.join("keypoints_np", split, cls)
+            for file in os.listdir(cls_dir):
+                if file.endswith(".mp4"):
+                    jobs.append((os.path.join(cls_dir, file),
+                                 os.path.join(out_dir, file.replace(".mp4", ".npy"))))
+    return jobs
+
+
+def read_frames(cap):
+    """Yield the BGR frames to landmark according to SAMPLE_MODE."""
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if SAMPLE_MODE == "head" or n_frames <= 0:  # unknown length: fall back to head
+        wanted = set(range(SEQ_LEN))
+    else:
+        wanted = set(sample_indices(n_frames, SEQ_LEN))
+
+    last = max(wanted, default=-1)
+    for idx in range(last + 1):
+        if idx in wanted:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.grab(), None  # advance without retrieving the frame
+        if not ret:
+            return
+        if frame is not None:
+            yield frame
+
+
+def cache_params():
+    """Everything extract_video's output depends on, for the cache key."""
+    return dict(HANDS_PARAMS, seq_len=SEQ_LEN, sample_mode=SAMPLE_MODE,
+                mediapipe=mp.__version__, opencv=cv2.__version__,
+                code=source_digest(read_frames, extract_video, landmarks_to_array, sample_indices))
+
+
+def extract_video(hands, video_path):
+    # Start every clip without tracking state from the previous one, so the
+    # result depends only on the video and the parameters (the cache key).
+    hands.reset()
+    cap = cv2.VideoCapture(video_path)
+    # read_frames yields at most SEQ_LEN frames; unfilled rows stay zero padding
+    seq = np.zeros((SEQ_LEN, HANDS, LANDMARKS, COORDS), dtype=np.float32)
+
+    for t, frame in enumerate(read_frames(cap)):
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = hands.process(frame_rgb)
+        landmarks_to_array(results, out=seq[t])
+
+    cap.release()
+
+    return seq.reshape(SEQ_LEN, FEATURES)
+
+
+if __name__ == "__main__":
+    cache = ExtractionCache(cache_params()) if USE_CACHE else None
+    hands = None  # created on the first cache miss
+
+    jobs = list_jobs()
+    print(f"\n📌 Processing: {len(jobs)} videos")
+
+    for video_path, out_path in jobs:
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+        seq = cache.get(video_path) if cache else None
+        if seq is None:
+            if hands is None:
+                hands = mp_hands.Hands(**HANDS_PARAMS)
+            seq = extract_video(hands, video_path)
+            if cache:
+                cache.put(video_path, seq)
+
+        save_clip(out_path, seq)
+
+    if hands is not None:
+        hands.close()
+
+    if cache:
+        report = cache.close()
+        with open(REPORT_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Cache: {report['hits']} hits, {report['misses']} misses, "
+              f"{report['evicted']} evicted (report: {REPORT_PATH})")
+    print("\n✅ Extraction completed successfully!")
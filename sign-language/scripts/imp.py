@@ -10,6 +10,8 @@ import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader, WeightedRandomSampler
 import torch.optim as optim
 
+from scan_dataset import valid_clips
+
 # ---------- CONFIG ----------
 KEYPOINT_DIR = "keypoints_small/train"
 VAL_KEYPOINT_DIR = "keypoints_small/test"
@@ -23,6 +25,11 @@ MODEL_OUT = "models/sign_model_improved.pth"
 
 # ---------- Dataset ----------
 def load_npy_list(base_dir):
+    scanned = valid_clips(base_dir)
+    if scanned is not None:
+        # Validated clip list from scan_dataset.py: no directory walk
+        items = list(zip(scanned["path"].tolist(), scanned["class"].tolist()))
+        return items, scanned["classes"].tolist()
     items = []
     classes = sorted([d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir,d))])
     for cls in classes:
@@ -0,0 +1,192 @@
+import os
+import glob
+import shutil
+import json
+import numpy as np
+
+from split_data import MANIFEST, read_manifest, keypoint_path
+from hand_features import HANDS, LANDMARKS, COORDS, FEATURES
+
+# ---------------- CONFIG ---------------- #
+SOURCE_DIR = "keypoints_np"       # <split>/<class>/*.npy (used when there is no manifest)
+STORE_DIR = "keypoints_q"         # <split>/shard_XXXX.npz + meta.json
+FORMAT = "int16"                  # "int16" (fixed point) or "float16"
+CHUNK_SIZE = 256                  # clips per compressed shard
+# int16 fixed point: value = q * SCALE, i.e. a range of [-4, 4) with ~1.2e-4
+# resolution. MediaPipe x/y are roughly [0, 1] and z is small, so nothing clips.
+SCALE = 1.0 / 8192
+
+
+def encode(seqs, fmt=FORMAT):
+    """
+    (N, T, 126) float -> landmarks (N, T, 2, 21, 3) int16/float16 and a
+    presence bitmask (N, T) uint8 with bit h set when hand h has data.
+    """
+    hands = np.asarray(seqs, dtype=np.float32).reshape(len(seqs), -1, HANDS, LANDMARKS, COORDS)
+    present_hands = np.abs(hands).sum(axis=(3, 4)) > 0          # (N, T, 2)
+    present = (present_hands * np.array([1, 2], dtype=np.uint8)).sum(axis=-1).astype(np.uint8)
+
+    if fmt == "int16":
+        q = np.clip(np.rint(hands / SCALE), -32768, 32767).astype(np.int16)
+    elif fmt == "float16":
+        q = hands.astype(np.float16)
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+    q[~present_hands] = 0
+    return q, present
+
+
+def decode(landmarks, present, fmt=FORMAT):
+    """Vectorized inverse of encode(): whole batch -> float32 (N, T, 126)."""
+    x = landmarks.astype(np.float32)
+    if fmt == "int16":
+        x *= SCALE
+    bits = np.array([1, 2], dtype=np.uint8)
+    mask = (present[..., None] & bits) > 0                       # (N, T, 2)
+    x *= mask[..., None, None]
+    return x.reshape(x.shape[0], x.shape[1], FEATURES)
+
+
+def write_shard(path, seqs, labels, paths, fmt=FORMAT):
+    lengths = np.array([len(s) for s in seqs], dtype=np.int32)
+    padded = np.zeros((len(seqs), lengths.max(), FEATURES), dtype=np.float32)
+    for i, s in enumerate(seqs):
+        padded[i, :len(s)] = s
+    landmarks, present = encode(padded, fmt)
+    np.savez_compressed(path, landmarks=landmarks, present=present, lengths=lengths,
+                        labels=np.array(labels, dtype=np.int16), paths=np.array(paths))
+
+
+class KeypointStore:
+    """Read side of the compact format: one split, decoded shard by shard."""
+
+    def __init__(self, root=STORE_DIR, split="train"):
+        with open(os.path.join(root, "meta.json")) as f:
+            meta = json.load(f)
+        self.classes = meta["classes"]
+        self.format = meta["format"]
+        self.shards = sorted(glob.glob(os.path.join(root, split, "shard_*.npz")))
+
+    def clips(self):
+        """Yield (landmarks, present, label, source path) per clip, still encoded and cut to its length."""
+        for path in self.shards:
+            with np.load(path) as z:
+                landmarks, present = z["landmarks"], z["present"]
+                for j, (n, label, src) in enumerate(zip(z["lengths"], z["labels"], z["paths"])):
+                    yield landmarks[j, :n].copy(), present[j, :n].copy(), int(label), str(src)
+
+    def decode_clip(self, landmarks, present):
+        """One clip from clips() -> float32 (T, 126)."""
+        return decode(landmarks[None], present[None], self.format)[0]
+
+    def iter_shards(self):
+        for path in self.shards:
+            with np.load(path) as z:
+                yield decode(z["landmarks"], z["present"], self.format), z["labels"], z["lengths"]
+
+    def load(self, seq_len=None):
+        """Decode the whole split: X float32 (N, T, 126), labels (N,), lengths (N,).
+        With seq_len every clip is cropped / zero-padded to seq_len frames."""
+        xs, labels, lengths = [], [], []
+        for x, y, n in self.iter_shards():
+            xs.append(x)
+            labels.append(y)
+            lengths.append(n)
+        if not xs:
+            return np.zeros((0, seq_len or 0, FEATURES), np.float32), np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+        T = seq_len or max(x.shape[1] for x in xs)
+        X = np.zeros((sum(len(x) for x in xs), T, FEATURES), dtype=np.float32)
+        i = 0
+        for x in xs:
+            t = min(T, x.shape[1])
+            X[i:i + len(x), :t] = x[:, :t]
+            i += len(x)
+        lengths = np.minimum(np.concatenate(lengths), T)
+        return X, np.concatenate(labels).astype(np.int64), lengths.astype(np.int64)
+
+    def batches(self, batch_size, seq_len=None):
+        """Yield (X, y) float32 / int64 torch tensors of batch_size clips."""
+        import torch
+        X, y, _ = self.load(seq_len)
+        X, y = torch.from_numpy(X), torch.from_numpy(y)
+        for i in range(0, len(X), batch_size):
+            yield X[i:i + batch_size], y[i:i + batch_size]
+
+
+def list_sources():
+    """{split: [(npy path, class)]} from the split manifest or the keypoints_np tree."""
+    sources = {}
+    if os.path.exists(MANIFEST):
+        for r in read_manifest(MANIFEST):
+            sources.setdefault(r["split"], []).append((keypoint_path(r), r["class"]))
+        return sources
+    for split in sorted(os.listdir(SOURCE_DIR)):
+        for cls in sorted(os.listdir(os.path.join(SOURCE_DIR, split))):
+            for f in sorted(glob.glob(os.path.join(SOURCE_DIR, split, cls, "*.npy"))):
+                sources.setdefault(split, []).append((f, cls))
+    return sources
+
+
+def convert(out_dir=STORE_DIR, fmt=FORMAT, chunk_size=CHUNK_SIZE):
+    """
+    Write the compact store and return an accuracy / size report. Each split
+    is written to <split>.tmp and swapped in whole, so no shard of an earlier,
+    larger conversion survives; splits that no longer exist are removed.
+    """
+    sources = list_sources()
+    classes = sorted({cls for items in sources.values() for _, cls in items})
+    class_to_idx = {c: i for i, c in enumerate(classes)}
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"classes": classes, "format": fmt, "scale": SCALE}, f)
+
+    src_bytes = out_bytes = 0
+    max_err = sum_err = n_values = 0.0
+    for split, items in sources.items():
+        tmp_dir = os.path.join(out_dir, split + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for c in range(0, len(items), chunk_size):
+            chunk = items[c:c + chunk_size]
+            seqs = [np.load(p).astype(np.float32).reshape(-1, FEATURES) for p, _ in chunk]
+            path = os.path.join(tmp_dir, f"shard_{c // chunk_size:04d}.npz")
+            write_shard(path, seqs, [class_to_idx[cls] for _, cls in chunk], [p for p, _ in chunk], fmt)
+
+            src_bytes += sum(os.path.getsize(p) for p, _ in chunk)
+            out_bytes += os.path.getsize(path)
+            with np.load(path) as z:
+                decoded = decode(z["landmarks"], z["present"], fmt)
+            for s, d in zip(seqs, decoded):
+                err = np.abs(d[:len(s)] - s)
+                max_err = max(max_err, float(err.max(initial=0.0)))
+                sum_err += float(err.sum())
+                n_values += err.size
+        shutil.rmtree(os.path.join(out_dir, split), ignore_errors=True)
+        os.replace(tmp_dir, os.path.join(out_dir, split))
+
+    # Splits of an earlier conversion that the sources no longer have
+    for name in os.listdir(out_dir):
+        old = os.path.join(out_dir, name)
+        if name not in sources and os.path.isdir(old) and glob.glob(os.path.join(old, "shard_*.npz")):
+            shutil.rmtree(old)
+
+    return {
+        "format": fmt,
+        "clips": sum(len(v) for v in sources.values()),
+        "source_bytes": src_bytes,
+        "store_bytes": out_bytes,
+        "ratio": src_bytes / max(1, out_bytes),
+        "max_abs_error": max_err,
+        "mean_abs_error": sum_err / max(1, n_values),
+    }
+
+
+if __name__ == "__main__":
+    report = convert()
+    with open(os.path.join(STORE_DIR, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Converted {report['clips']} clips to {STORE_DIR} ({report['format']})")
+    print(f"   Size: {report['source_bytes'] / 1e6:.2f} MB -> {report['store_bytes'] / 1e6:.2f} MB "
+          f"({report['ratio']:.1f}x smaller)")
+    print(f"   Error: max {report['max_abs_error']:.2e}, mean {report['mean_abs_error']:.2e}")
@@ -3,7 +3,14 @@ import torch
 import numpy as np
 import mediapipe as mp
 import json
-import os       
+import os
+import time
+import queue
+import argparse
+import threading
+
+from hand_features import (landmarks_to_array, normalize_landmarks, HANDS, LANDMARKS, COORDS, FEATURES,
+                           FEATURE_LAYOUT, LEGACY_LAYOUT, WINDOW_FPS)
 
 # ---------------- CONFIG ---------------- #
 MODEL_PATH = "models/sign_model_mobile.pt"
@@ -11,15 +18,37 @@ CLASS_PATH = "models/class_names.json"
 SEQ_LEN = 40
 CONF_THRESHOLD = 0.50
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# Capture, landmarking, inference and display run on separate threads joined by
+# small drop-oldest queues, so the window keeps the camera frame rate even when
+# the model is slower. False runs everything serially in one loop.
+PIPELINED = True
+INFER_EVERY = 2   # run the model every N landmarked frames
+# Every frame is landmarked (tracking needs it), but only every WINDOW_STRIDE-th
+# goes into the model window, so it spans the same ~3 s as the training clips.
+CAMERA_FPS = 30
+WINDOW_STRIDE = max(1, round(CAMERA_FPS / WINDOW_FPS))
+QUEUE_SIZE = 2
+# Headless benchmarking (see --help): video file or directory of frames as input,
+# no window, per-stage timings and sustained FPS at the end.
+SOURCE = "0"          # camera index, video file or directory of frames
+HEADLESS = False
+OUTPUT_DIR = None     # write annotated frames here (headless only)
 
 #Load Model #
 with open(CLASS_PATH, "r") as f:
     class_names = json.load(f)
 
-model = torch.jit.load(MODEL_PATH, map_location=DEVICE)
+export_info = {"export.json": ""}
+model = torch.jit.load(MODEL_PATH, map_location=DEVICE, _extra_files=export_info)
 model.eval()
+# Hand slot layout the model was trained on; exports without export.json predate the handedness slots
+feature_layout = (json.loads(export_info["export.json"]).get("feature_layout", FEATURE_LAYOUT)
+                  if export_info["export.json"] else LEGACY_LAYOUT)
+# Length-aware exports take forward(x, lengths); older ones only forward(x)
+model_takes_lengths = len(model.forward.schema.arguments) > 2
+full_length = torch.tensor([SEQ_LEN])
 
-print("TorchScript model loaded!")
+print(f"TorchScript model loaded! ({feature_layout} hand layout)")
 
 # Mediapipe hands #
 mp_hands = mp.solutions.hands
@@ -31,63 +60,348 @@ hands = mp_hands.Hands(
 mp_draw = mp.solutions.drawing_utils
 
 
-def extract_hand_keypoints(results):
-    keypoints = []
+def extract_hand_keypoints(results, out):
+    """(126,) keypoints written into the preallocated (2, 21, 3) `out`."""
+    return landmarks_to_array(results, out, feature_layout).reshape(FEATURES)
 
-    if results.multi_hand_landmarks:
-        for hand in results.multi_hand_landmarks[:2]:  # Take up to 2 hands
-            for lm in hand.landmark:
-                keypoints.extend([lm.x, lm.y, lm.z])
 
-        if len(results.multi_hand_landmarks) == 1:
-            keypoints.extend([0] * (21 * 3))  # Pad missing hand
-    else:
-        keypoints.extend([0] * (21 * 3 * 2))  # No hands
+def keypoint_buffer():
+    return np.zeros((HANDS, LANDMARKS, COORDS), dtype=np.float32)
 
-    return np.array(keypoints, dtype=np.float32)
 
+class WindowBuffer:
+    """
+    Last SEQ_LEN keypoint frames in a preallocated tensor. Every frame is
+    written twice (slot i and i + SEQ_LEN), so the window in time order is
+    always the contiguous slice [pos, pos + SEQ_LEN): no per-frame allocation
+    or list -> tensor conversion.
+    """
 
-# ---------------- Webcam Loop ---------------- #
-cap = cv2.VideoCapture(0)
-sequence = []
-pred_text = ""
+    def __init__(self, seq_len=SEQ_LEN, features=FEATURES):
+        self.seq_len = seq_len
+        self.data = torch.zeros(1, 2 * seq_len, features)
+        self.pos = 0
+        self.count = 0
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def append(self, keypoints):
+        frame = torch.from_numpy(keypoints)
+        self.data[0, self.pos] = frame
+        self.data[0, self.pos + self.seq_len] = frame
+        self.pos = (self.pos + 1) % self.seq_len
+        self.count += 1
 
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
+    def full(self):
+        return self.count >= self.seq_len
+
+    def window(self):
+        return self.data[:, self.pos:self.pos + self.seq_len]
+
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue whose put() never blocks: when full, the oldest item is discarded.
+    With drop=False it is a plain blocking queue (file sources: every frame counts)."""
+
+    def __init__(self, maxsize, drop=True):
+        super().__init__(maxsize)
+        self.drop = drop
+
+    def put(self, item):
+        if not self.drop:
+            super().put(item)
+            return
+        while True:
+            try:
+                super().put(item, block=False)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class StageTimer:
+    """Per-stage wall-clock samples, shared by the pipeline threads."""
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.samples.setdefault(stage, []).append(seconds)
 
-    keypoints = extract_hand_keypoints(results)
-    sequence.append(keypoints)
-    sequence = sequence[-SEQ_LEN:]
+    def report(self, frames):
+        elapsed = time.perf_counter() - self.start
+        print(f"\n{'stage':<10}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}")
+        for stage, times in self.samples.items():
+            ms = np.array(times) * 1000
+            print(f"{stage:<10}{len(ms):>8}{ms.mean():>10.2f}{np.percentile(ms, 95):>10.2f}")
+        print(f"Sustained: {frames} frames in {elapsed:.1f}s = {frames / max(elapsed, 1e-9):.1f} FPS")
 
-    if len(sequence) == SEQ_LEN:
-        seq = torch.tensor([sequence], dtype=torch.float32).to(DEVICE)
 
-        with torch.no_grad():
-            preds = model(seq)
-            probs = torch.softmax(preds, dim=1)[0]
-            max_prob, pred_class = torch.max(probs, dim=0)
+class FrameDirSource:
+    """cv2.VideoCapture-like reader over the images of a directory, in name order."""
 
-        if max_prob > CONF_THRESHOLD:
-            pred_text = class_names[pred_class]
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
 
-    if results.multi_hand_landmarks:
+    def __init__(self, path):
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(self.EXTENSIONS))
+        self.index = 0
+
+    def read(self):
+        if self.index >= len(self.files):
+            return False, None
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+def open_source(source):
+    """Returns (capture, is_live) for a camera index, video file or frame directory."""
+    if str(source).isdigit():
+        return cv2.VideoCapture(int(source)), True
+    if os.path.isdir(source):
+        return FrameDirSource(source), False
+    return cv2.VideoCapture(source), False
+
+
+def predict(window):
+    """Class name for a (1, SEQ_LEN, 126) window, or None below CONF_THRESHOLD."""
+    # Same per-hand bounding-box normalization the model was trained with
+    seq = torch.from_numpy(normalize_landmarks(window[0].numpy()))[None]
+    with torch.no_grad():
+        seq = seq.to(DEVICE)
+        preds = model(seq, full_length) if model_takes_lengths else model(seq)
+        probs = torch.softmax(preds, dim=1)[0]
+        max_prob, pred_class = torch.max(probs, dim=0)
+    if max_prob > CONF_THRESHOLD:
+        return class_names[pred_class]
+    return None
+
+
+def draw(frame, results, pred_text):
+    """Landmarks on the unmirrored frame, then mirror it for display. Returns the mirrored frame."""
+    if results is not None and results.multi_hand_landmarks:
         for hand in results.multi_hand_landmarks:
             mp_draw.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
 
+    frame = cv2.flip(frame, 1)
     cv2.putText(frame, pred_text, (25, 80),
                 cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
+    return frame
 
+
+def show(frame, results, pred_text):
+    frame = draw(frame, results, pred_text)
     cv2.imshow("Live ASL Recognition - Press Q to Quit", frame)
+    return cv2.waitKey(1) & 0xFF != ord("q")
+
+
+class FrameWriter:
+    """Headless renderer: annotated frames to out_dir, or nothing at all."""
 
-    if cv2.waitKey(1) & 0xFF == ord("q"):
-        break
+    def __init__(self, out_dir=None):
+        self.out_dir = out_dir
+        self.count = 0
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
 
-cap.release()
-hands.close()
-cv2.destroyAllWindows()
+    def __call__(self, frame, results, pred_text):
+        if self.out_dir:
+            frame = draw(frame, results, pred_text)
+            cv2.imwrite(os.path.join(self.out_dir, f"{self.count:06d}.jpg"), frame)
+        self.count += 1
+        return True
+
+
+def run_serial(cap, render=show, timer=None, infer_every=INFER_EVERY, max_frames=None):
+    timer = timer or StageTimer()
+    window = WindowBuffer()
+    keypoints = keypoint_buffer()
+    pred_text = ""
+    frames = 0
+
+    while max_frames is None or frames < max_frames:
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        t1 = time.perf_counter()
+        timer.add("capture", t1 - t0)
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = hands.process(rgb)
+        if frames % WINDOW_STRIDE == 0:
+            window.append(extract_hand_keypoints(results, keypoints))
+        t2 = time.perf_counter()
+        timer.add("landmark", t2 - t1)
+
+        frames += 1
+        if window.full() and frames % infer_every == 0:
+            pred_text = predict(window.window()) or pred_text
+            t3 = time.perf_counter()
+            timer.add("infer", t3 - t2)
+            t2 = t3
+
+        keep_going = render(frame, results, pred_text)
+        timer.add("render", time.perf_counter() - t2)
+        if not keep_going:
+            break
+    return frames
+
+
+class Pipeline:
+    """
+    capture -> landmark -> inference threads; rendering stays on the calling
+    thread (imshow must). Live sources use drop-oldest queues and render every
+    captured frame with the latest landmarks. With lockstep=True (file sources)
+    queues block, the landmark thread runs the model itself on every INFER_EVERY-th
+    ready window, and every frame is rendered with its own landmarks and the
+    prediction as of that frame, so the run is repeatable.
+    """
+
+    def __init__(self, cap, render=show, timer=None, infer_every=INFER_EVERY,
+                 queue_size=QUEUE_SIZE, lockstep=False, max_frames=None):
+        self.cap = cap
+        self.render = render
+        self.timer = timer or StageTimer()
+        self.infer_every = infer_every
+        self.lockstep = lockstep
+        self.max_frames = max_frames
+        self.landmark_q = DropOldestQueue(queue_size, drop=not lockstep)
+        self.render_q = DropOldestQueue(queue_size, drop=not lockstep)
+        self.window = WindowBuffer()
+        self.model_input = torch.zeros(1, SEQ_LEN, FEATURES)
+        self.window_lock = threading.Lock()
+        self.window_ready = threading.Event()
+        self.stop = threading.Event()
+        self.done = threading.Event()
+
+        # Latest results shared with the display
+        self.results = None
+        self.pred_text = ""
+
+        stages = (self.capture_loop, self.landmark_loop) + (() if lockstep else (self.inference_loop,))
+        self.threads = [threading.Thread(target=t, daemon=True) for t in stages]
+
+    def capture_loop(self):
+        frames = 0
+        while not self.stop.is_set() and (self.max_frames is None or frames < self.max_frames):
+            t0 = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            # Landmarks come from the unmirrored frame, as in the recordings, so
+            # MediaPipe's handedness matches training; draw() mirrors for display.
+            # The landmark stage gets its own RGB copy; the display draws on `frame`
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.timer.add("capture", time.perf_counter() - t0)
+            frames += 1
+            self.landmark_q.put((frame, rgb))
+            if not self.lockstep:
+                self.render_q.put((frame, None, None))
+        self.landmark_q.put(None)
+        if not self.lockstep:
+            self.render_q.put(None)
+
+    def landmark_loop(self):
+        frames = 0
+        keypoints = keypoint_buffer()
+        while True:
+            item = self.landmark_q.get()
+            if item is None:
+                break
+            frame, rgb = item
+            t0 = time.perf_counter()
+            results = hands.process(rgb)
+            self.results = results
+            with self.window_lock:
+                if frames % WINDOW_STRIDE == 0:
+                    self.window.append(extract_hand_keypoints(results, keypoints))
+                ready = self.window.full()
+            self.timer.add("landmark", time.perf_counter() - t0)
+            frames += 1
+            if ready and frames % self.infer_every == 0:
+                if self.lockstep:
+                    self.infer()  # before this frame is rendered, not whenever a thread gets to it
+                else:
+                    self.window_ready.set()
+            if self.lockstep:
+                self.render_q.put((frame, results, self.pred_text))
+        if self.lockstep:
+            self.render_q.put(None)
+
+    def infer(self):
+        t0 = time.perf_counter()
+        with self.window_lock:
+            self.model_input.copy_(self.window.window())
+        self.pred_text = predict(self.model_input) or self.pred_text
+        self.timer.add("infer", time.perf_counter() - t0)
+
+    def inference_loop(self):
+        # Live sources: latest ready window only; windows that arrive while the model runs coalesce
+        while not self.done.is_set():
+            if not self.window_ready.wait(timeout=0.1):
+                continue
+            self.window_ready.clear()
+            self.infer()
+
+    def run(self):
+        for t in self.threads:
+            t.start()
+        frames = 0
+        while True:
+            item = self.render_q.get()
+            if item is None:
+                break
+            if self.stop.is_set():
+                continue  # drain until the capture thread winds down
+            frame, results, pred_text = item
+            t0 = time.perf_counter()
+            if self.lockstep:
+                keep_going = self.render(frame, results, pred_text)
+            else:
+                keep_going = self.render(frame, self.results, self.pred_text)
+            if not keep_going:
+                self.stop.set()
+            self.timer.add("render", time.perf_counter() - t0)
+            frames += 1
+        self.done.set()
+        for t in self.threads:
+            t.join()
+        return frames
+
+
+# ---------------- Webcam Loop ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live sign recognition (webcam or recorded input)")
+    parser.add_argument("--source", default=SOURCE, help="camera index, video file or directory of frames")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS, help="no window; report timings")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="save annotated frames (headless)")
+    parser.add_argument("--serial", action="store_true", default=not PIPELINED, help="single-threaded loop")
+    parser.add_argument("--infer-every", type=int, default=INFER_EVERY)
+    parser.add_argument("--max-frames", type=int)
+    args = parser.parse_args()
+
+    cap, is_live = open_source(args.source)
+    render = FrameWriter(args.output_dir) if args.headless else show
+    timer = StageTimer()
+
+    if args.serial:
+        frames = run_serial(cap, render, timer, args.infer_every, args.max_frames)
+    else:
+        frames = Pipeline(cap, render, timer, args.infer_every, lockstep=not is_live,
+                          max_frames=args.max_frames).run()
+
+    cap.release()
+    hands.close()
+    if args.headless:
+        timer.report(frames)
+    else:
+        cv2.destroyAllWindows()
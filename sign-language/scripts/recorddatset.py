@@ -1,16 +1,76 @@
 import cv2
 import os
 import time
+import queue
+import threading
+import numpy as np
+import mediapipe as mp
+
+from hand_features import landmarks_to_array, HANDS, LANDMARKS, COORDS, FEATURES
+from scan_dataset import save_clip
 
 CLASSES = ["hello", "yes", "no", "eat", "drink", "help"]
 SAVE_DIR = "data_record"
+KEYPOINT_DIR = "keypoints_record"  # <class>/<class>_<idx>.npy, same naming as the videos
 FPS = 30
 VIDEO_DURATION = 3  # seconds
 FRAMES_PER_VIDEO = FPS * VIDEO_DURATION
 
+# Run MediaPipe on the live stream and save keypoints directly, so the
+# split -> decode -> extract pass is not needed for newly recorded classes.
+RECORD_KEYPOINTS = True
+# Keep the raw mp4 as well (encoded on a background thread).
+SAVE_VIDEO = True
+
+
+class BackgroundVideoWriter(threading.Thread):
+    """Encodes frames on a worker thread so the capture loop never waits on the encoder."""
+
+    def __init__(self, path, fps, size):
+        super().__init__(daemon=True)
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self.writer = cv2.VideoWriter(path, fourcc, fps, size)
+        self.frames = queue.Queue()  # unbounded: capture must never block on a put
+        self.start()
+
+    def write(self, frame):
+        self.frames.put(frame)
+
+    def close(self):
+        self.frames.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            self.writer.write(frame)
+        self.writer.release()
+
+
+def count_samples(folder):
+    return len(os.listdir(folder)) if os.path.isdir(folder) else 0
+
+
 # Make folders
 for cls in CLASSES:
-    os.makedirs(os.path.join(SAVE_DIR, cls), exist_ok=True)
+    if SAVE_VIDEO:
+        os.makedirs(os.path.join(SAVE_DIR, cls), exist_ok=True)
+    if RECORD_KEYPOINTS:
+        os.makedirs(os.path.join(KEYPOINT_DIR, cls), exist_ok=True)
+
+hands = None
+if RECORD_KEYPOINTS:
+    # Tracking mode (static_image_mode=False): detection only runs when the
+    # tracker loses the hands, which keeps per-frame cost low enough for 30 fps.
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=2,
+        model_complexity=1,
+        min_detection_confidence=0.4,
+        min_tracking_confidence=0.4
+    )
 
 cap = cv2.VideoCapture(0)
 cap.set(cv2.CAP_PROP_FPS, FPS)
@@ -21,7 +81,8 @@ print("Press ESC to exit")
 
 for cls in CLASSES:
     print(f"\n📌 Class: {cls}")
-    existing = len(os.listdir(os.path.join(SAVE_DIR, cls)))
+    existing = max(count_samples(os.path.join(SAVE_DIR, cls)),
+                   count_samples(os.path.join(KEYPOINT_DIR, cls)))
     target = 20
 
     for idx in range(existing, target):
@@ -40,6 +101,8 @@ for cls in CLASSES:
             if cv2.waitKey(1) & 0xFF == 27:
                 cap.release()
                 cv2.destroyAllWindows()
+                if hands is not None:
+                    hands.close()
                 exit()
 
         # Countdown
@@ -52,25 +115,43 @@ for cls in CLASSES:
 
         # Recording
         video_path = os.path.join(SAVE_DIR, cls, f"{cls}_{idx}.mp4")
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(video_path, fourcc, FPS, (frame.shape[1], frame.shape[0]))
+        keypoint_path = os.path.join(KEYPOINT_DIR, cls, f"{cls}_{idx}.npy")
+        out = None
+        if SAVE_VIDEO:
+            out = BackgroundVideoWriter(video_path, FPS, (frame.shape[1], frame.shape[0]))
+        if hands is not None:
+            hands.reset()  # don't carry tracked hands over from the previous sample
+        seq = np.zeros((FRAMES_PER_VIDEO, HANDS, LANDMARKS, COORDS), dtype=np.float32)
 
         frames = 0
         start_time = time.time()
 
         while frames < FRAMES_PER_VIDEO:
             ret, frame = cap.read()
-            out.write(frame)
-            cv2.putText(frame, f"Recording {cls} {frames}/{FRAMES_PER_VIDEO}",
+            if out is not None:
+                out.write(frame)
+            if hands is not None:
+                results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                landmarks_to_array(results, out=seq[frames])
+
+            display = frame.copy()  # the writer thread may still be reading `frame`
+            cv2.putText(display, f"Recording {cls} {frames}/{FRAMES_PER_VIDEO}",
                         (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 2)
-            cv2.imshow("Recorder", frame)
+            cv2.imshow("Recorder", display)
             frames += 1
             if cv2.waitKey(1) & 0xFF == 27:
                 break
 
-        out.release()
-        print(f"✅ Saved: {video_path}")
+        elapsed = time.time() - start_time
+        if hands is not None:
+            save_clip(keypoint_path, seq[:frames].reshape(frames, FEATURES))
+            print(f"✅ Saved: {keypoint_path} ({frames} frames, {frames / elapsed:.1f} fps)")
+        if out is not None:
+            out.close()
+            print(f"✅ Saved: {video_path}")
 
 cap.release()
 cv2.destroyAllWindows()
+if hands is not None:
+    hands.close()
 print("✅ Finished all recordings!")
@@ -1,16 +1,13 @@
 import torch
-import numpy as np
-from train_model import SignLSTM
+from train_model import load_checkpoint_model, SAVE_PTH, SEQ_LEN, INPUT_SIZE
 
 # Load checkpoint
-ckpt = torch.load("models/sign_model.pth", map_location="cpu")
-model = SignLSTM(input_size=225, hidden_size=128, num_classes=len(ckpt["class_names"]))
-model.load_state_dict(ckpt["model_state"])
-model.eval()
+model, class_names = load_checkpoint_model(SAVE_PTH)
 
-# Dummy input: batch=1, seq_len=40, features=225
-x = torch.zeros((1, 40, 225), dtype=torch.float32)
+# Dummy input: batch=1, seq_len=40, features=126
+x = torch.zeros((1, SEQ_LEN, INPUT_SIZE), dtype=torch.float32)
+lengths = torch.tensor([SEQ_LEN])
 
 with torch.no_grad():
-    out = model(x)
-    print("Output shape:", tuple(out.shape))
+    out = model(x, lengths)
+    print("Output shape:", tuple(out.shape), f"(expected (1, {len(class_names)}))")
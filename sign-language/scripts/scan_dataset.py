@@ -0,0 +1,278 @@
+import os
+import time
+import argparse
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+
+import numpy as np
+
+from split_data import MANIFEST, read_manifest, keypoint_path
+from hand_features import HANDS, LANDMARKS, COORDS, FEATURES
+
+# ---------------- CONFIG ---------------- #
+# Columnar manifest: one array per column, one entry per clip. KeypointDataset
+# (train_model.py) and imp.py read it instead of walking and loading every file.
+SCAN_MANIFEST = "splits/scan.npz"
+ROOTS = ["keypoints_np"]   # walked when there is no split manifest
+WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 32
+
+
+def list_clips(roots=None):
+    """
+    Returns ([(path, class, split)], source). Without roots the clips come from
+    the split manifest if it exists (source = MANIFEST), else from ROOTS. Roots
+    are walked as <root>[/<split>]/<class>/<clip>.npy.
+    """
+    if not roots:
+        if os.path.exists(MANIFEST):
+            return [(keypoint_path(r), r["class"], r["split"]) for r in read_manifest(MANIFEST)], MANIFEST
+        roots = ROOTS
+
+    clips = []
+    for root in roots:
+        for dirpath, _, files in os.walk(root):
+            parts = os.path.relpath(dirpath, root).split(os.sep)
+            cls = parts[-1]
+            split = parts[-2] if len(parts) >= 2 else ""
+            for f in sorted(files):
+                if f.endswith(".npy"):
+                    clips.append((os.path.join(dirpath, f), cls, split))
+    return sorted(clips), ",".join(roots)
+
+
+def walked_dirs(roots):
+    """Every directory under the roots; adding, removing or replacing a clip changes its directory's mtime."""
+    return sorted(dirpath for root in roots for dirpath, _, _ in os.walk(root))
+
+
+def save_clip(path, seq):
+    """
+    np.save through a temporary file and a rename, so re-extracting a clip
+    changes its directory's mtime and load_scan() notices it.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, seq)
+    os.replace(tmp, path)
+
+
+def mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def scan_clip(path):
+    """Per-clip stats; never raises, problems go into 'error'."""
+    stats = {"frames": 0, "features": 0, "true_length": 0, "missing_hand_ratio": 1.0,
+             "dtype": "", "has_nan": False, "bytes": 0, "mtime_ns": -1, "error": ""}
+    try:
+        st = os.stat(path)
+        stats["bytes"], stats["mtime_ns"] = st.st_size, st.st_mtime_ns
+        seq = np.load(path)
+        stats["dtype"] = str(seq.dtype)
+        stats["frames"] = int(seq.shape[0]) if seq.ndim else 0
+        stats["features"] = int(np.prod(seq.shape[1:])) if seq.ndim else 0
+        if seq.ndim != 2 or seq.shape[1] != FEATURES:
+            stats["error"] = f"shape {seq.shape}, expected (frames, {FEATURES})"
+            return stats
+        if not len(seq):
+            stats["error"] = "empty"
+            return stats
+
+        finite = np.isfinite(seq)
+        stats["has_nan"] = not bool(finite.all())
+        if stats["has_nan"]:
+            stats["error"] = "NaN/inf values"
+
+        # True length: up to the last frame with any landmark (trailing zeros are padding)
+        filled = np.flatnonzero(np.abs(np.where(finite, seq, 0)).sum(axis=1) > 0)
+        length = int(filled[-1] + 1) if len(filled) else 0
+        stats["true_length"] = length
+        if length:
+            hands = np.abs(seq[:length].reshape(length, HANDS, LANDMARKS * COORDS)).sum(axis=2) > 0
+            stats["missing_hand_ratio"] = float((~hands).any(axis=1).mean())
+        else:
+            stats["error"] = stats["error"] or "no landmarks"
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+    return stats
+
+
+def scan(clips, workers=WORKERS):
+    """Columns (dict of arrays) for the clips, scanned on a process pool."""
+    paths = [p for p, _, _ in clips]
+    with Pool(workers) as pool:
+        results = list(pool.imap(scan_clip, paths, chunksize=CHUNK_SIZE))
+
+    columns = {
+        "path": np.array(paths, dtype=str),
+        "class": np.array([c for _, c, _ in clips], dtype=str),
+        "split": np.array([s for _, _, s in clips], dtype=str),
+    }
+    for key, dtype in (("frames", np.int32), ("features", np.int32), ("true_length", np.int32),
+                       ("missing_hand_ratio", np.float32), ("dtype", str), ("has_nan", bool),
+                       ("bytes", np.int64), ("mtime_ns", np.int64), ("error", str)):
+        columns[key] = np.array([r[key] for r in results], dtype=dtype)
+    columns["ok"] = columns["error"] == ""
+    return columns
+
+
+def write_scan(columns, source, path=SCAN_MANIFEST):
+    """
+    Saves the columns plus what load_scan() checks for staleness: the clips'
+    mtime/size are columns already, and the mtimes of their directories (every
+    directory of a walked root, or the split manifest clips' directories) are
+    stored too. (The split manifest's own mtime covers clips added to or
+    removed from it.)
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if source == MANIFEST:
+        dirs = sorted({os.path.dirname(p) for p in columns["path"]})
+    else:
+        roots = source.split(",")
+        dirs = sorted(set(walked_dirs(roots)) | set(roots))
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, source=np.array(source), dir_path=np.array(dirs, dtype=str),
+             dir_mtime_ns=np.array([mtime_ns(d) for d in dirs], dtype=np.int64), **columns)
+    os.replace(tmp, path)
+
+
+def stale_reason(columns, path=SCAN_MANIFEST):
+    """
+    Why the scan no longer describes the clips on disk, or None if it is
+    current. Only directories whose mtime changed since the scan are listed,
+    and only their clips are stat'ed: an unchanged directory had no clip
+    added, removed or replaced.
+    """
+    if columns["source"] == MANIFEST and os.path.exists(MANIFEST) \
+            and os.path.getmtime(MANIFEST) > os.path.getmtime(path):
+        return f"older than {MANIFEST}"
+
+    walked = columns["source"] != MANIFEST
+    clips, subdirs = defaultdict(list), defaultdict(set)
+    for i, clip in enumerate(columns["path"]):
+        clips[os.path.dirname(clip)].append(i)
+    for d in columns["dir_path"]:
+        subdirs[os.path.dirname(d)].add(d)
+
+    for d, mtime in zip(columns["dir_path"], columns["dir_mtime_ns"]):
+        now = mtime_ns(d)
+        if now == mtime:
+            continue
+        if now == -1:
+            return f"{d} is missing"
+        if mtime == -1:
+            return f"{d} was created"
+        entries = {e.name: e for e in os.scandir(str(d))}
+        if walked:
+            found = {os.path.join(d, n) for n, e in entries.items() if e.is_dir()}
+            if found != subdirs[d] - {d}:
+                return f"folders added or removed in {d}"
+            found = {os.path.join(d, n) for n, e in entries.items() if n.endswith(".npy") and not e.is_dir()}
+            if found != {columns["path"][i] for i in clips[d]}:
+                return f"clips added or removed in {d}"
+        for i in clips[d]:
+            clip = columns["path"][i]
+            entry = entries.get(os.path.basename(clip))
+            if entry is None:
+                if columns["mtime_ns"][i] != -1:
+                    return f"{clip} is missing"
+                continue  # was missing at scan time too (recorded as invalid)
+            st = entry.stat()
+            if st.st_mtime_ns != columns["mtime_ns"][i] or st.st_size != columns["bytes"][i]:
+                return f"{clip} changed"
+    return None
+
+
+def load_scan(path=SCAN_MANIFEST):
+    """
+    Columns of a scan manifest, or None if it is missing or out of date: older
+    than the split manifest, a clip re-extracted (mtime or size changed) or
+    missing, or clips added to or removed from a walked root.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as z:
+        columns = {k: z[k] for k in z.files}
+    columns["source"] = str(columns["source"])
+    if "mtime_ns" not in columns:
+        print(f"⚠️ {path} has no clip mtimes (older scanner); rerun scan_dataset.py. Ignoring it.")
+        return None
+    reason = stale_reason(columns, path)
+    if reason is not None:
+        print(f"⚠️ {path} is out of date ({reason}); rerun scan_dataset.py. Ignoring it.")
+        return None
+    return columns
+
+
+def under_root(columns, root):
+    """Boolean mask of the clips inside `root`."""
+    root = os.path.normpath(root) + os.sep
+    return np.array([os.path.normpath(p).startswith(root) for p in columns["path"]], dtype=bool)
+
+
+def valid_clips(root=None, path=SCAN_MANIFEST):
+    """
+    Columns of the valid scanned clips under `root`, or of the split manifest
+    when root is None, plus "classes": every class of that source, including
+    ones whose clips are all invalid, so label indices don't shift. None when
+    there is no up-to-date scan of that source, so callers fall back to
+    walking the folders.
+    """
+    columns = load_scan(path)
+    if columns is None:
+        return None
+    if root is None:
+        if columns["source"] != MANIFEST:
+            return None
+        inside = np.ones(len(columns["path"]), dtype=bool)
+    else:
+        inside = under_root(columns, root)
+    if not inside.any():
+        return None
+
+    invalid = int((inside & ~columns["ok"]).sum())
+    if invalid:
+        print(f"⚠️ Skipping {invalid} invalid clips listed in {path}")
+    keep = inside & columns["ok"]
+    valid = {k: v[keep] for k, v in columns.items() if k not in ("source", "dir_path", "dir_mtime_ns")}
+    valid["classes"] = np.unique(columns["class"][inside])
+    return valid
+
+
+def print_report(columns, elapsed):
+    n = len(columns["path"])
+    ok = columns["ok"]
+    print(f"\n📌 Scanned {n} clips in {elapsed:.1f}s ({n / max(elapsed, 1e-9):.0f} clips/s)")
+    for split in sorted(set(columns["split"])):
+        counts = Counter(columns["class"][(columns["split"] == split) & ok])
+        print(f"{split or '(no split)'}: {sum(counts.values())} clips {dict(sorted(counts.items()))}")
+    if ok.any():
+        lengths = columns["true_length"][ok]
+        print(f"True length: min {lengths.min()}, median {int(np.median(lengths))}, max {lengths.max()} | "
+              f"missing-hand frames: {columns['missing_hand_ratio'][ok].mean() * 100:.1f}% | "
+              f"dtypes: {dict(Counter(columns['dtype'][ok]))}")
+    for path, error in zip(columns["path"][~ok], columns["error"][~ok]):
+        print(f"❌ {path}: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan keypoint clips into a validated columnar manifest")
+    parser.add_argument("roots", nargs="*",
+                        help="keypoint roots to walk (default: the split manifest if present, else keypoints_np)")
+    parser.add_argument("--out", default=SCAN_MANIFEST)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    clips, source = list_clips(args.roots)
+    if not clips:
+        raise SystemExit("No clips found")
+    columns = scan(clips, args.workers)
+    elapsed = time.perf_counter() - start
+    write_scan(columns, source, args.out)
+    print_report(columns, elapsed)
+    print(f"\n✅ Saved {args.out}")
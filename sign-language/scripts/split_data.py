@@ -1,31 +1,105 @@
-import os, shutil, random
+import os, csv, shutil, random
 
-DATA_DIR = "data_record"
-TRAIN_DIR = "keypoints_6/train"
-TEST_DIR = "keypoints_6/test"
+# Class folders of recorded clips: raw videos and keypoints recorded live by
+# recorddatset.py. If a clip exists in both, the keypoints are used.
+SOURCES = ["data_record", "keypoints_record"]
+MANIFEST = "splits/manifest.csv"
+# Keypoints extracted from the videos in the manifest, <class>/<clip>.npy.
+# They don't depend on the split, so re-splitting never re-extracts.
+CLIP_KEYPOINT_DIR = "keypoints_clips"
 SPLIT = 0.8
+SEED = 42
 
-os.makedirs(TRAIN_DIR, exist_ok=True)
-os.makedirs(TEST_DIR, exist_ok=True)
+# "manifest" only writes MANIFEST. "hardlink", "symlink" and "copy" also build
+# the old <root>/<split>/<class> trees for tools that still walk folders.
+LINK_MODE = "manifest"
+LEGACY_ROOTS = {".mp4": "keypoints_6", ".npy": "keypoints_np"}
 
-for cls in os.listdir(DATA_DIR):
-    class_dir = os.path.join(DATA_DIR, cls)
-    if not os.path.isdir(class_dir):
-        continue
 
-    files = os.listdir(class_dir)
-    random.shuffle(files)
+def collect_clips(sources=SOURCES):
+    """Return {class: {clip name: path}} for every recorded clip."""
+    clips = {}
+    for data_dir in sources:
+        if not os.path.isdir(data_dir):
+            continue
+        for cls in sorted(os.listdir(data_dir)):
+            class_dir = os.path.join(data_dir, cls)
+            if not os.path.isdir(class_dir):
+                continue
+            for f in sorted(os.listdir(class_dir)):
+                name, ext = os.path.splitext(f)
+                if ext not in LEGACY_ROOTS:
+                    continue
+                known = clips.setdefault(cls, {}).get(name)
+                if known is None or ext == ".npy":
+                    clips[cls][name] = os.path.join(class_dir, f)
+    return clips
 
-    split_idx = int(len(files) * SPLIT)
-    train_files = files[:split_idx]
-    test_files = files[split_idx:]
 
-    os.makedirs(os.path.join(TRAIN_DIR, cls), exist_ok=True)
-    os.makedirs(os.path.join(TEST_DIR, cls), exist_ok=True)
+def split_clips(clips, ratio=SPLIT, seed=SEED):
+    """Stratified split: each class is shuffled with its own seeded RNG, so
+    adding a class or a clip never reshuffles the other classes."""
+    rows = []
+    for cls in sorted(clips):
+        names = sorted(clips[cls])
+        random.Random(f"{seed}:{cls}").shuffle(names)
+        split_idx = int(len(names) * ratio)
+        for i, name in enumerate(names):
+            split = "train" if i < split_idx else "test"
+            rows.append({"path": clips[cls][name], "class": cls, "split": split})
+    return rows
 
-    for f in train_files:
-        shutil.copy(os.path.join(class_dir, f), os.path.join(TRAIN_DIR, cls, f))
-    for f in test_files:
-        shutil.copy(os.path.join(class_dir, f), os.path.join(TEST_DIR, cls, f))
 
-print(" Split complete!")
+def write_manifest(rows, path=MANIFEST):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["path", "class", "split"])
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def read_manifest(path=MANIFEST, split=None):
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if split is not None:
+        rows = [r for r in rows if r["split"] == split]
+    return rows
+
+
+def keypoint_path(row, keypoint_dir=CLIP_KEYPOINT_DIR):
+    """Where the (frames, 126) keypoints of a manifest row live."""
+    if row["path"].endswith(".npy"):
+        return row["path"]
+    name = os.path.splitext(os.path.basename(row["path"]))[0]
+    return os.path.join(keypoint_dir, row["class"], name + ".npy")
+
+
+def materialize(rows, mode=LINK_MODE):
+    link = {"hardlink": os.link, "symlink": os.symlink, "copy": shutil.copy}[mode]
+    for row in rows:
+        root = LEGACY_ROOTS[os.path.splitext(row["path"])[1]]
+        out_dir = os.path.join(root, row["split"], row["class"])
+        os.makedirs(out_dir, exist_ok=True)
+        dst = os.path.join(out_dir, os.path.basename(row["path"]))
+        # Drop this clip from both splits so a re-split never leaves it in the old one.
+        for split in ("train", "test"):
+            old = os.path.join(root, split, row["class"], os.path.basename(row["path"]))
+            if os.path.lexists(old):
+                os.remove(old)
+        src = os.path.abspath(row["path"]) if mode == "symlink" else row["path"]
+        link(src, dst)
+
+
+if __name__ == "__main__":
+    rows = split_clips(collect_clips())
+    write_manifest(rows)
+    n_train = sum(r["split"] == "train" for r in rows)
+    print(f" Wrote {MANIFEST}: {n_train} train / {len(rows) - n_train} test (seed={SEED})")
+
+    if LINK_MODE != "manifest":
+        materialize(rows)
+        print(f" Materialized split trees with {LINK_MODE}")
+
+    print(" Split complete!")
@@ -0,0 +1,127 @@
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+import torch
+import torch.multiprocessing as mp
+from torch.utils.data import TensorDataset, DataLoader
+
+from train_model import (KeypointDataset, LengthBucketSampler, collate_trimmed, train, measure_latency,
+                         KEYPOINT_STORE)
+
+# ---------------- CONFIG ---------------- #
+SEARCH_SPACE = {
+    "hidden": [64, 128, 192],
+    "lr": [1e-3, 5e-4],
+    "batch_size": [8, 16],
+    "dropout": [0.3, 0.4],
+    "epochs": [50],
+}
+SWEEP_DIR = "sweeps"
+LATENCY_RUNS = 50
+
+# Set in each worker by _init_worker
+_data = None
+
+
+def load_shared_data(store=KEYPOINT_STORE):
+    """Load and normalize both splits once, as tensors in shared memory (from a keypoint store if given)."""
+    data = {}
+    for split in ("train", "test"):
+        ds = KeypointDataset(split, store)
+        X, y, lengths = (torch.stack(t) for t in zip(*(ds[i] for i in range(len(ds)))))
+        data[split] = tuple(t.share_memory_() for t in (X, y, lengths))
+        data["classes"] = ds.classes
+    return data
+
+
+def _init_worker(data, threads):
+    global _data
+    _data = data
+    torch.set_num_threads(threads)
+
+
+def run_trial(args):
+    trial_id, config, out_dir = args
+    train_set = TensorDataset(*_data["train"])
+    test_set = TensorDataset(*_data["test"])
+    train_loader = DataLoader(train_set, batch_sampler=LengthBucketSampler(_data["train"][2], config["batch_size"]),
+                              collate_fn=collate_trimmed)
+    test_loader = DataLoader(test_set, batch_sampler=LengthBucketSampler(_data["test"][2], config["batch_size"], shuffle=False),
+                             collate_fn=collate_trimmed)
+
+    save_path = os.path.join(out_dir, f"trial_{trial_id:03d}.pth")
+    start = time.perf_counter()
+    result = train(train_loader, test_loader, _data["classes"], save_path=save_path,
+                   epochs=config["epochs"], hidden=config["hidden"], lr=config["lr"],
+                   dropout=config["dropout"], verbose=False)
+    model = result["model"].cpu().eval()
+    # Resume state is only useful while the trial runs
+    last_path = os.path.splitext(save_path)[0] + "_last.pth"
+    if os.path.exists(last_path):
+        os.remove(last_path)
+
+    return dict(
+        trial=trial_id,
+        **config,
+        val_acc=round(result["final_fp32_acc"], 4),
+        epochs_run=result["epochs"],
+        params=sum(p.numel() for p in model.parameters()),
+        # Parameter bytes only: the checkpoint file also holds optimizer state
+        size_kb=round(sum(p.numel() * p.element_size() for p in model.parameters()) / 1024, 1),
+        latency_ms=round(measure_latency(model, runs=LATENCY_RUNS), 3),
+        train_s=round(time.perf_counter() - start, 1),
+    )
+
+
+def expand(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for BiLSTMAttn")
+    parser.add_argument("--space", help="JSON file with a search space (default: SEARCH_SPACE)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--store", default=KEYPOINT_STORE, help="read clips from this keypoint_store.py directory")
+    args = parser.parse_args()
+
+    space = SEARCH_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    configs = expand(space)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    out_dir = os.path.join(SWEEP_DIR, time.strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+
+    data = load_shared_data(args.store)
+    print(f"📌 {len(configs)} configurations, {args.workers} workers x {threads} threads")
+
+    # Spawned workers import torch fresh, so cap their OpenMP pools up front
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    start = time.perf_counter()
+    results = []
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(args.workers, initializer=_init_worker, initargs=(data, threads)) as pool:
+        jobs = [(i, c, out_dir) for i, c in enumerate(configs)]
+        for r in pool.imap_unordered(run_trial, jobs):
+            results.append(r)
+            print(f"  trial {r['trial']:3d}: acc {r['val_acc']*100:.2f}% | {r['latency_ms']:.2f} ms | {r['train_s']:.0f}s")
+
+    results.sort(key=lambda r: (-r["val_acc"], r["latency_ms"]))
+    table = os.path.join(out_dir, "results.csv")
+    with open(table, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["rank"] + list(results[0]))
+        writer.writeheader()
+        for rank, r in enumerate(results, 1):
+            writer.writerow(dict(rank=rank, **r))
+
+    print(f"\n✅ Sweep finished in {time.perf_counter() - start:.0f}s, results: {table}")
+    for rank, r in enumerate(results[:5], 1):
+        print(f"{rank}. acc {r['val_acc']*100:.2f}% | {r['latency_ms']:.2f} ms | {r['size_kb']} KB | "
+              f"hidden={r['hidden']} lr={r['lr']} batch={r['batch_size']} dropout={r['dropout']}")
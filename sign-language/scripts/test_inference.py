@@ -1,50 +1,39 @@
-import os
 import torch
 import numpy as np
-from train_model import SignLSTM
+from train_model import KeypointDataset, load_checkpoint_model, normalize_landmarks, true_length, SAVE_PTH
 
 
 def load_and_prepare_sequence(npy_path, seq_len=40):
-    seq = np.load(npy_path, allow_pickle=True)
+    seq = np.load(npy_path, allow_pickle=True).astype(np.float32)
     # Pad or crop to fixed length
     if len(seq) < seq_len:
         pad = np.zeros((seq_len - len(seq), seq.shape[1]), dtype=np.float32)
         seq = np.vstack((seq, pad))
     else:
         seq = seq[:seq_len, :]
-    return seq.reshape(1, seq_len, -1).astype(np.float32)
+    # Same per-frame bounding-box normalization as training
+    seq = normalize_landmarks(seq)
+    return seq.reshape(1, seq_len, -1)
 
 
 if __name__ == "__main__":
-    checkpoint = torch.load("models/sign_model_normalized.pth", map_location="cpu")
-    class_names = checkpoint["class_names"]
-
-    model = SignLSTM(input_size=225, hidden_size=128, num_classes=len(class_names))
-    model.load_state_dict(checkpoint["model_state"])
-    model.eval()
+    model, class_names = load_checkpoint_model(SAVE_PTH)
     print("✅ Model loaded successfully.")
 
-    # Pick any test file under keypoints/test/<label>/*.npy
-    test_root = os.path.join("keypoints", "test")
-    npy_path = None
-    for label in os.listdir(test_root):
-        label_dir = os.path.join(test_root, label)
-        if not os.path.isdir(label_dir):
-            continue
-        files = [f for f in os.listdir(label_dir) if f.endswith('.npy')]
-        if files:
-            npy_path = os.path.join(label_dir, files[0])
-            break
-
-    if not npy_path:
-        raise FileNotFoundError("No .npy files found under keypoints/test/. Run extract_keypoints.py first.")
+    # Pick the first test clip (from the split manifest or keypoints_np/test)
+    test_ds = KeypointDataset("test")
+    if not test_ds.files:
+        raise FileNotFoundError("No test .npy files found. Run split_data.py and extract_keypoints.py first.")
+    npy_path = test_ds.files[0]
 
     seq_array = load_and_prepare_sequence(npy_path, seq_len=40)
     x = torch.tensor(seq_array, dtype=torch.float32)
+    lengths = torch.tensor([true_length(seq_array[0])])
 
     with torch.no_grad():
-        output = model(x)
+        output = model(x, lengths)
         predicted_class = torch.argmax(output, dim=1).item()
 
     print(f" File: {npy_path}")
     print(f" Predicted word: {class_names[predicted_class]}")
+    print(f" Expected word: {test_ds.classes[test_ds.labels[0]]}")
@@ -1,15 +1,32 @@
 import os
+import copy
 import glob
 import json
+import time
+import random
+import sys
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from typing import Optional
+from torch.utils.data import Dataset, DataLoader, Sampler
 from tqdm import tqdm
 
+from split_data import MANIFEST, read_manifest, keypoint_path
+from checkpoint_writer import BackgroundCheckpointWriter
+from hand_features import normalize_landmarks, sample_indices, FEATURE_LAYOUT, LEGACY_LAYOUT
+from scan_dataset import valid_clips
+from keypoint_store import KeypointStore
+from export_model import export_dynamic
+
 # CONFIG
 KEYPOINT_DIR = "./keypoints_np"
+# Read clips from the compact store written by keypoint_store.py (e.g. "keypoints_q")
+# instead of the .npy files: one compressed read per shard, and clips stay int16 /
+# float16 in memory until a batch needs them. Re-run keypoint_store.py after the
+# clips change; the store is not checked against them.
+KEYPOINT_STORE = None
 SEQ_LEN = 40
 BATCH_SIZE = 8
 EPOCHS = 50
@@ -19,71 +36,95 @@ DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 SAVE_PTH = "models/sign_model_normalized.pth"
 SAVE_TORCHSCRIPT = "models/sign_model_mobile.pt"
 CLASS_NAMES_JSON = "models/class_names.json"
+INPUT_SIZE = 126  # Fixed: 21 landmarks * 3 coords * 2 hands
+EARLY_STOP_PATIENCE = 15
+SEED = 42
 
-os.makedirs("models", exist_ok=True)
+# Opt-in faster CPU training. Each falls back to fp32 eager if unsupported.
+AMP_BF16 = False        # bfloat16 autocast for forward/loss
+COMPILE = False         # torch.compile(BiLSTMAttn)
+# Train fp32 eager and the mode above back to back and compare final accuracy
+PARITY_CHECK = False
+PARITY_TOLERANCE = 0.02
+# Clips longer than SEQ_LEN (keypoints_record/: every frame of a 3 s recording at
+# 30 fps) are resampled to SEQ_LEN frames spread over the whole clip, the same
+# indices extract_keypoints.py's "uniform" mode landmarks from videos, so every
+# training window spans the same time (see hand_features.WINDOW_FPS). False
+# keeps their first SEQ_LEN frames, matching "head" mode.
+RESAMPLE_LONG_CLIPS = True
+# Group clips of similar true length into batches and trim each batch to its
+# longest clip, so short clips don't pay for padding frames.
+BUCKET_BATCHES = True
 
-def normalize_landmarks(seq):
-    """
-    Normalize landmarks relative to bounding box for each frame.
-    Input: (SEQ_LEN, 126) where 126 = 21*3*2 (x,y,z for 2 hands)
-    Output: (SEQ_LEN, 126) normalized
-    """
-    normalized = np.zeros_like(seq)
-    
-    for t in range(seq.shape[0]):
-        frame = seq[t].reshape(2, 21, 3)  # (2 hands, 21 landmarks, 3 coords)
-        
-        for hand_idx in range(2):
-            hand = frame[hand_idx]  # (21, 3)
-            
-            # Check if hand has data (not all zeros)
-            if np.sum(np.abs(hand)) > 0:
-                xs = hand[:, 0]
-                ys = hand[:, 1]
-                zs = hand[:, 2]
-                
-                # Get bounding box
-                min_x, max_x = xs.min(), xs.max()
-                min_y, max_y = ys.min(), ys.max()
-                
-                range_x = max_x - min_x
-                range_y = max_y - min_y
-                
-                # Normalize x, y relative to bounding box
-                if range_x > 0:
-                    hand[:, 0] = (xs - min_x) / range_x
-                if range_y > 0:
-                    hand[:, 1] = (ys - min_y) / range_y
-                # Keep z as is (or normalize if needed)
-                
-                frame[hand_idx] = hand
-        
-        normalized[t] = frame.reshape(126)
-    
-    return normalized
+# Full training state (model, optimizer, scheduler, early-stop counters, RNG) is
+# written every CHECKPOINT_EVERY epochs to <save_path>_last.pth on a background
+# thread. RESUME (or `--resume` on the command line) continues from it.
+CHECKPOINT_EVERY = 1
+RESUME = False
+
+os.makedirs("models", exist_ok=True)
 
 # Dataset with normalization
 class KeypointDataset(Dataset):
-    def __init__(self, split):
+    def __init__(self, split, store=KEYPOINT_STORE):
         self.files = []
         self.labels = []
-        base = os.path.join(KEYPOINT_DIR, split)
-        classes = sorted(os.listdir(base))
+        self.lengths = None
+        self.store = None
+
+        scanned = None if store else valid_clips(None if os.path.exists(MANIFEST) else KEYPOINT_DIR)
+        if store:
+            # Encoded clips from keypoint_store.py; classes come from the whole store
+            self.store = KeypointStore(store, split)
+            classes = self.store.classes
+            self.encoded = []
+            for landmarks, present, label, path in self.store.clips():
+                self.encoded.append((landmarks, present))
+                self.labels.append(label)
+                self.files.append(path)
+        elif scanned is not None and (scanned["split"] == split).any():
+            # Validated clips and their lengths from scan_dataset.py: nothing to list or load here
+            classes = scanned["classes"].tolist()
+            class_to_idx = {c: i for i, c in enumerate(classes)}
+            in_split = scanned["split"] == split
+            self.files = scanned["path"][in_split].tolist()
+            self.labels = [class_to_idx[c] for c in scanned["class"][in_split]]
+            self.lengths = [sampled_length(n, length) for n, length in
+                            zip(scanned["frames"][in_split], scanned["true_length"][in_split])]
+        elif os.path.exists(MANIFEST):
+            # Classes come from the whole manifest so train and test share indices
+            rows = read_manifest(MANIFEST)
+            classes = sorted({r["class"] for r in rows})
+            class_to_idx = {c: i for i, c in enumerate(classes)}
+            for r in rows:
+                if r["split"] == split:
+                    self.files.append(keypoint_path(r))
+                    self.labels.append(class_to_idx[r["class"]])
+        else:
+            base = os.path.join(KEYPOINT_DIR, split)
+            classes = sorted(os.listdir(base))
+            for idx, c in enumerate(classes):
+                folder = os.path.join(base, c)
+                for f in glob.glob(folder + "/*.npy"):
+                    self.files.append(f)
+                    self.labels.append(idx)
         self.classes = classes
-        
-        for idx, c in enumerate(classes):
-            folder = os.path.join(base, c)
-            for f in glob.glob(folder + "/*.npy"):
-                self.files.append(f)
-                self.labels.append(idx)
+        if self.lengths is None:
+            self.lengths = [true_length(self.clip(i)) for i in range(len(self.files))]
         
         print(f"{split} dataset: {len(self.files)} samples, {len(classes)} classes")
     
     def __len__(self):
         return len(self.files)
     
+    def clip(self, i):
+        """Clip i as load_clip() returns it, from the .npy file or decoded from the store."""
+        if self.store is None:
+            return load_clip(self.files[i])
+        return resample_clip(self.store.decode_clip(*self.encoded[i]))
+    
     def __getitem__(self, i):
-        x = np.load(self.files[i]).astype(np.float32)
+        x = self.clip(i)
         
         # Pad or truncate to SEQ_LEN
         if x.shape[0] < SEQ_LEN:
@@ -95,23 +136,75 @@ class KeypointDataset(Dataset):
         # Normalize landmarks
         x = normalize_landmarks(x)
         
-        return torch.from_numpy(x), torch.tensor(self.labels[i], dtype=torch.long)
+        return (torch.from_numpy(x), torch.tensor(self.labels[i], dtype=torch.long),
+                torch.tensor(self.lengths[i], dtype=torch.long))
+
+
+def load_clip(path):
+    """(frames, 126) float32 clip, resampled to SEQ_LEN frames if longer (RESAMPLE_LONG_CLIPS)."""
+    return resample_clip(np.load(path).astype(np.float32))
+
+
+def resample_clip(x):
+    """A (frames, 126) clip as load_clip() returns it."""
+    if RESAMPLE_LONG_CLIPS and len(x) > SEQ_LEN:
+        x = x[sample_indices(len(x), SEQ_LEN)]
+    return x
 
-# Load datasets
-train_ds = KeypointDataset("train")
-test_ds = KeypointDataset("test")
-INPUT_SIZE = 126  # Fixed: 21 landmarks * 3 coords * 2 hands
 
-print("\nClasses:", train_ds.classes)
-print("Input size per frame:", INPUT_SIZE)
+def sampled_length(n_frames, length):
+    """true_length() of an n_frames clip with `length` real frames, after load_clip()."""
+    if RESAMPLE_LONG_CLIPS and n_frames > SEQ_LEN:
+        # Sampled frames that fall before the clip's trailing padding
+        length = int(np.searchsorted(sample_indices(int(n_frames), SEQ_LEN), length))
+    return int(min(SEQ_LEN, max(1, length)))
 
-# Save class names for Android app
-with open(CLASS_NAMES_JSON, 'w') as f:
-    json.dump(train_ds.classes, f)
-print(f"Saved class names to {CLASS_NAMES_JSON}")
 
-train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True, num_workers=0)
-test_loader = DataLoader(test_ds, batch_size=BATCH_SIZE, num_workers=0)
+def true_length(seq):
+    """Frames up to the last one with any landmark (trailing zero rows are padding), capped at SEQ_LEN."""
+    filled = np.flatnonzero(np.abs(seq).reshape(len(seq), -1).sum(axis=1) > 0)
+    return int(min(SEQ_LEN, max(1, filled[-1] + 1 if len(filled) else 1)))
+
+
+class LengthBucketSampler(Sampler):
+    """Batch sampler: clips sorted by length (random tie order), cut into
+    batches, batch order shuffled every epoch."""
+
+    def __init__(self, lengths, batch_size, shuffle=True):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __iter__(self):
+        order = np.random.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+        order = order[np.argsort(self.lengths[order], kind="stable")]
+        batches = [order[i:i + self.batch_size].tolist() for i in range(0, len(order), self.batch_size)]
+        if self.shuffle:
+            random.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def collate_trimmed(batch):
+    """Stack a batch and drop the frames past its longest clip."""
+    X, y, lengths = (torch.stack(t) for t in zip(*batch))
+    return X[:, :int(lengths.max())], y, lengths
+
+def build_loaders(store=KEYPOINT_STORE):
+    train_ds = KeypointDataset("train", store)
+    test_ds = KeypointDataset("test", store)
+    if BUCKET_BATCHES:
+        train_loader = DataLoader(train_ds, batch_sampler=LengthBucketSampler(train_ds.lengths, BATCH_SIZE),
+                                  collate_fn=collate_trimmed, num_workers=0)
+        test_loader = DataLoader(test_ds, batch_sampler=LengthBucketSampler(test_ds.lengths, BATCH_SIZE, shuffle=False),
+                                 collate_fn=collate_trimmed, num_workers=0)
+    else:
+        train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True, num_workers=0)
+        test_loader = DataLoader(test_ds, batch_size=BATCH_SIZE, num_workers=0)
+    return train_ds, test_ds, train_loader, test_loader
+
 
 # Model: BiLSTM with Attention
 class BiLSTMAttn(nn.Module):
@@ -130,12 +223,24 @@ class BiLSTMAttn(nn.Module):
         self.fc = nn.Linear(hidden_size * 2, num_classes)
         self.bn = nn.BatchNorm1d(hidden_size * 2)
     
-    def forward(self, x):
-        # x: (B, T, F)
-        out, _ = self.lstm(x)  # (B, T, H*2)
+    def forward(self, x, lengths: Optional[torch.Tensor] = None):
+        # x: (B, T, F), lengths: (B,) real frames per clip, the rest is padding
+        if lengths is None:
+            out, (h, c) = self.lstm(x)  # (B, T, H*2)
+        else:
+            packed = nn.utils.rnn.pack_padded_sequence(
+                x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            # Distinct names per type so the forward also compiles with torch.jit.script
+            packed_out, (h, c) = self.lstm(packed)
+            out, out_lengths = nn.utils.rnn.pad_packed_sequence(
+                packed_out, batch_first=True, total_length=x.size(1))
         
-        # Attention mechanism
-        attn_weights = torch.softmax(self.attn(out), dim=1)  # (B, T, 1)
+        # Attention mechanism (padding frames get zero weight)
+        scores = self.attn(out)  # (B, T, 1)
+        if lengths is not None:
+            padding = torch.arange(x.size(1), device=x.device)[None, :] >= lengths.to(x.device)[:, None]
+            scores = scores.masked_fill(padding.unsqueeze(-1), float('-inf'))
+        attn_weights = torch.softmax(scores, dim=1)  # (B, T, 1)
         context = torch.sum(attn_weights * out, dim=1)  # (B, H*2)
         
         # Batch norm + dropout + FC
@@ -146,34 +251,135 @@ class BiLSTMAttn(nn.Module):
         return logits
 
 
-if __name__ == '__main__':
-    # Initialize model
-    model = BiLSTMAttn(INPUT_SIZE, HIDDEN, len(train_ds.classes)).to(DEVICE)
+def seed_everything(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def prepare_fast_mode(model, criterion, example, amp_bf16, compile_model):
+    """
+    Try the requested mode on one batch and fall back when it fails.
+    Returns (module to run, amp enabled, compiled).
+    """
+    if not (amp_bf16 or compile_model):
+        return model, False, False
+
+    runner = model
+    if compile_model:
+        if hasattr(torch, "compile"):
+            runner = torch.compile(model)
+        else:
+            print("⚠️ torch.compile not available, using eager mode")
+            compile_model = False
+
+    # The probe step must not leak into training (BatchNorm running stats)
+    initial_state = copy.deepcopy(model.state_dict())
+    X, y, lengths = (t.to(DEVICE) for t in example)
+    while amp_bf16 or compile_model:
+        try:
+            with torch.autocast(device_type=DEVICE, dtype=torch.bfloat16, enabled=amp_bf16):
+                loss = criterion(runner(X, lengths), y)
+            loss.backward()
+            break
+        except Exception as e:
+            mode = "torch.compile" if compile_model else "bf16 autocast"
+            print(f"⚠️ {mode} failed ({type(e).__name__}: {e}), falling back")
+            if compile_model:
+                runner, compile_model = model, False
+            else:
+                amp_bf16 = False
+    model.zero_grad(set_to_none=True)
+    model.load_state_dict(initial_state)
+    return runner, amp_bf16, compile_model
+
+
+def evaluate(runner, loader, criterion, amp_bf16=False):
+    runner.eval()
+    correct = total = 0
+    loss_sum = 0.0
+    with torch.no_grad(), torch.autocast(device_type=DEVICE, dtype=torch.bfloat16, enabled=amp_bf16):
+        for X, y, lengths in loader:
+            X, y = X.to(DEVICE), y.to(DEVICE)
+            logits = runner(X, lengths)
+            loss_sum += criterion(logits, y).item()
+            correct += (logits.argmax(dim=1) == y).sum().item()
+            total += y.size(0)
+    return correct / max(1, total), loss_sum / max(1, len(loader))
+
+
+def rng_state():
+    state = {'python': random.getstate(), 'numpy': np.random.get_state(), 'torch': torch.get_rng_state()}
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state):
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+def train(train_loader, test_loader, class_names, amp_bf16=False, compile_model=False,
+          save_path=SAVE_PTH, epochs=EPOCHS, hidden=HIDDEN, lr=LR, dropout=0.4, verbose=True,
+          resume=False):
+    """Train BiLSTMAttn, keep the best checkpoint at save_path, return a summary dict."""
+    seed_everything()
+    log = print if verbose else (lambda *args, **kwargs: None)
+    model = BiLSTMAttn(INPUT_SIZE, hidden, len(class_names), dropout=dropout).to(DEVICE)
     criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=LR, weight_decay=1e-5)
+    optimizer = optim.Adam(model.parameters(), lr=lr, weight_decay=1e-5)
     scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode='max', factor=0.5, patience=5)
 
-    print(f"\nModel parameters: {sum(p.numel() for p in model.parameters()):,}")
-    print(f"Training on: {DEVICE}\n")
+    # `model` keeps the plain parameter names for checkpoints; `runner` may be compiled
+    runner, amp_bf16, compile_model = prepare_fast_mode(
+        model, criterion, next(iter(train_loader)), amp_bf16, compile_model)
+    mode = "+".join(m for m, on in (("bf16", amp_bf16), ("compile", compile_model)) if on) or "fp32"
+
+    log(f"\nModel parameters: {sum(p.numel() for p in model.parameters()):,}")
+    log(f"Training on: {DEVICE} ({mode})\n")
 
     # Training loop
     best_acc = 0.0
     patience_counter = 0
-    EARLY_STOP_PATIENCE = 15
+    epoch_times = []
+    start_epoch = 1
+
+    last_path = os.path.splitext(save_path)[0] + "_last.pth"
+    if resume and os.path.exists(last_path):
+        state = torch.load(last_path, map_location=DEVICE, weights_only=False)
+        model.load_state_dict(state['model_state_dict'])
+        optimizer.load_state_dict(state['optimizer_state_dict'])
+        scheduler.load_state_dict(state['scheduler_state_dict'])
+        best_acc = state['best_acc']
+        patience_counter = state['patience_counter']
+        epoch_times = state['epoch_times']
+        set_rng_state(state['rng_state'])
+        start_epoch = state['epoch'] + 1
+        log(f"↩️ Resumed from {last_path} at epoch {start_epoch} (best val_acc {best_acc*100:.2f}%)")
+    elif resume:
+        log(f"⚠️ No checkpoint at {last_path}, starting from scratch")
+
+    writer = BackgroundCheckpointWriter()
+    for epoch in range(start_epoch, epochs + 1):
+        epoch_start = time.perf_counter()
 
-    for epoch in range(1, EPOCHS + 1):
         # Train
-        model.train()
+        runner.train()
         train_loss = 0.0
         train_correct = 0
         train_total = 0
         
-        for X, y in tqdm(train_loader, desc=f"Epoch {epoch}/{EPOCHS}"):
+        for X, y, lengths in tqdm(train_loader, desc=f"Epoch {epoch}/{epochs}", disable=not verbose):
             X, y = X.to(DEVICE), y.to(DEVICE)
             
             optimizer.zero_grad()
-            logits = model(X)
-            loss = criterion(logits, y)
+            with torch.autocast(device_type=DEVICE, dtype=torch.bfloat16, enabled=amp_bf16):
+                logits = runner(X, lengths)
+                loss = criterion(logits, y)
             loss.backward()
             
             # Gradient clipping
@@ -190,27 +396,11 @@ if __name__ == '__main__':
         avg_train_loss = train_loss / len(train_loader)
         
         # Validation
-        model.eval()
-        val_correct = 0
-        val_total = 0
-        val_loss = 0.0
-        
-        with torch.no_grad():
-            for X, y in test_loader:
-                X, y = X.to(DEVICE), y.to(DEVICE)
-                logits = model(X)
-                loss = criterion(logits, y)
-                val_loss += loss.item()
-                
-                preds = logits.argmax(dim=1)
-                val_correct += (preds == y).sum().item()
-                val_total += y.size(0)
-        
-        val_acc = val_correct / val_total
-        avg_val_loss = val_loss / len(test_loader)
+        val_acc, avg_val_loss = evaluate(runner, test_loader, criterion, amp_bf16)
+        epoch_times.append(time.perf_counter() - epoch_start)
         
-        print(f"Epoch {epoch:3d} | Train Loss: {avg_train_loss:.4f} | Train Acc: {train_acc*100:.2f}% | "
-              f"Val Loss: {avg_val_loss:.4f} | Val Acc: {val_acc*100:.2f}%")
+        log(f"Epoch {epoch:3d} | Train Loss: {avg_train_loss:.4f} | Train Acc: {train_acc*100:.2f}% | "
+              f"Val Loss: {avg_val_loss:.4f} | Val Acc: {val_acc*100:.2f}% | {epoch_times[-1]:.1f}s")
         
         # Learning rate scheduling
         scheduler.step(val_acc)
@@ -220,48 +410,128 @@ if __name__ == '__main__':
             best_acc = val_acc
             patience_counter = 0
             
-            torch.save({
+            writer.save({
                 'epoch': epoch,
                 'model_state_dict': model.state_dict(),
                 'optimizer_state_dict': optimizer.state_dict(),
                 'val_acc': val_acc,
-                'class_names': train_ds.classes
-            }, SAVE_PTH)
-            print(f"✅ Saved best model with val_acc: {val_acc*100:.2f}%")
+                'class_names': class_names,
+                'feature_layout': FEATURE_LAYOUT
+            }, save_path)
+            log(f"✅ Saved best model with val_acc: {val_acc*100:.2f}%")
         else:
             patience_counter += 1
+
+        # Resumable state
+        if epoch % CHECKPOINT_EVERY == 0 or patience_counter >= EARLY_STOP_PATIENCE or epoch == epochs:
+            writer.save({
+                'epoch': epoch,
+                'model_state_dict': model.state_dict(),
+                'optimizer_state_dict': optimizer.state_dict(),
+                'scheduler_state_dict': scheduler.state_dict(),
+                'best_acc': best_acc,
+                'patience_counter': patience_counter,
+                'epoch_times': epoch_times,
+                'rng_state': rng_state(),
+                'class_names': class_names,
+                'feature_layout': FEATURE_LAYOUT
+            }, last_path)
         
         # Early stopping
         if patience_counter >= EARLY_STOP_PATIENCE:
-            print(f"\n⚠️ Early stopping triggered after {epoch} epochs")
+            log(f"\n⚠️ Early stopping triggered after {epoch} epochs")
             break
 
-    print(f"\n🎉 Training completed!")
-    print(f"Best validation accuracy: {best_acc*100:.2f}%")
-
-    # Export to TorchScript for Android
-    print("\n📱 Exporting to TorchScript for Android...")
+    writer.close()  # the best checkpoint must be on disk before it is reloaded
 
-    # Load best model
-    checkpoint = torch.load(SAVE_PTH, map_location='cpu')
+    # Final accuracy is always measured with the fp32 eager weights that get exported
+    checkpoint = torch.load(save_path, map_location=DEVICE)
     model.load_state_dict(checkpoint['model_state_dict'])
+    final_acc, _ = evaluate(model, test_loader, criterion)
+
+    return {
+        'mode': mode,
+        'model': model,
+        'best_acc': best_acc,
+        'final_fp32_acc': final_acc,
+        'epochs': len(epoch_times),
+        'sec_per_epoch': sum(epoch_times) / max(1, len(epoch_times)),
+    }
+
+
+def load_checkpoint_model(path=SAVE_PTH):
+    """
+    Rebuild BiLSTMAttn from a training checkpoint; returns (model, class_names).
+    model.feature_layout is the hand slot layout it was trained on (checkpoints
+    from before it was recorded used detection order).
+    """
+    checkpoint = torch.load(path, map_location='cpu')
+    state = checkpoint['model_state_dict']
+    hidden = state['lstm.weight_hh_l0'].shape[1]
+    model = BiLSTMAttn(INPUT_SIZE, hidden, len(checkpoint['class_names']))
+    model.load_state_dict(state)
     model.eval()
-    model.cpu()
+    model.feature_layout = checkpoint.get('feature_layout', LEGACY_LAYOUT)
+    return model, checkpoint['class_names']
+
 
-    # Trace model
-    example_input = torch.randn(1, SEQ_LEN, INPUT_SIZE)
-    traced_model = torch.jit.trace(model, example_input)
+def measure_latency(model, batch=1, runs=50, warmup=5, with_lengths=True):
+    """Median forward time in ms for a (batch, SEQ_LEN, INPUT_SIZE) input."""
+    x = torch.zeros(batch, SEQ_LEN, INPUT_SIZE)
+    args = (x, torch.full((batch,), SEQ_LEN, dtype=torch.long)) if with_lengths else (x,)
+    times = []
+    with torch.no_grad():
+        for i in range(warmup + runs):
+            start = time.perf_counter()
+            model(*args)
+            if i >= warmup:
+                times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
 
-    # Optimize for mobile
-    traced_model_optimized = torch.jit.optimize_for_inference(traced_model)
 
-    # Save
-    traced_model_optimized.save(SAVE_TORCHSCRIPT)
-    print(f"✅ Saved TorchScript model to {SAVE_TORCHSCRIPT}")
+def export_torchscript(model, path=SAVE_TORCHSCRIPT):
+    # Export forward(x, lengths), verified against the eager model for any batch size and length
+    exported = export_dynamic(model, path, input_size=INPUT_SIZE, seq_lens=(1, 5, SEQ_LEN // 2, SEQ_LEN - 1, SEQ_LEN))
+    print(f"✅ Saved TorchScript model to {path}")
     print(f"✅ Model ready for Android integration!")
 
     # Test the exported model
     print("\n🧪 Testing exported model...")
-    test_output = traced_model_optimized(example_input)
+    test_output = exported(torch.randn(1, SEQ_LEN, INPUT_SIZE), torch.tensor([SEQ_LEN]))
     print(f"Test output shape: {test_output.shape}")
-    print(f"Expected: (1, {len(train_ds.classes)})")
\ No newline at end of file
+    return exported
+
+
+if __name__ == '__main__':
+    train_ds, test_ds, train_loader, test_loader = build_loaders()
+
+    print("\nClasses:", train_ds.classes)
+    print("Input size per frame:", INPUT_SIZE)
+
+    # Save class names for Android app
+    with open(CLASS_NAMES_JSON, 'w') as f:
+        json.dump(train_ds.classes, f)
+    print(f"Saved class names to {CLASS_NAMES_JSON}")
+
+    if PARITY_CHECK:
+        baseline = train(train_loader, test_loader, train_ds.classes,
+                         save_path=SAVE_PTH.replace(".pth", "_fp32.pth"))
+    result = train(train_loader, test_loader, train_ds.classes, AMP_BF16, COMPILE,
+                   resume=RESUME or "--resume" in sys.argv)
+
+    print(f"\n🎉 Training completed!")
+    print(f"Best validation accuracy: {result['best_acc']*100:.2f}%")
+
+    print(f"\n{'mode':<16}{'epochs':>8}{'s/epoch':>10}{'fp32 acc':>10}")
+    for r in ([baseline] if PARITY_CHECK else []) + [result]:
+        print(f"{r['mode']:<16}{r['epochs']:>8}{r['sec_per_epoch']:>10.2f}{r['final_fp32_acc']*100:>9.2f}%")
+    if PARITY_CHECK:
+        gap = baseline['final_fp32_acc'] - result['final_fp32_acc']
+        status = "✅ parity ok" if gap <= PARITY_TOLERANCE else "⚠️ accuracy dropped"
+        print(f"{status}: {gap*100:+.2f} pts vs fp32, "
+              f"{baseline['sec_per_epoch'] / result['sec_per_epoch']:.2f}x epoch speed-up")
+
+    # Export to TorchScript for Android
+    print("\n📱 Exporting to TorchScript for Android...")
+    export_torchscript(result['model'])
+    print(f"Expected: (1, {len(train_ds.classes)})")
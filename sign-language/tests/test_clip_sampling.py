@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+
+@pytest.fixture
+def train_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # train_model creates models/ on import
+    import train_model
+    return train_model
+
+
+def recorded_clip(path, frames, filled):
+    """(frames, 126) clip whose frame index is stored in every feature; rows past `filled` are padding."""
+    clip = np.repeat(np.arange(1, frames + 1, dtype=np.float32)[:, None], 126, axis=1)
+    clip[filled:] = 0
+    np.save(path, clip)
+    return str(path)
+
+
+def test_long_recording_spans_whole_clip(train_model, tmp_path):
+    x = train_model.load_clip(recorded_clip(tmp_path / "rec.npy", 90, 90))
+    assert x.shape == (train_model.SEQ_LEN, 126)
+    assert x[0, 0] == 1 and x[-1, 0] == 90  # first and last frame of the 3 s recording
+
+
+def test_short_clip_unchanged(train_model, tmp_path):
+    x = train_model.load_clip(recorded_clip(tmp_path / "vid.npy", 25, 25))
+    assert x[:, 0].tolist() == list(range(1, 26))
+
+
+@pytest.mark.parametrize("frames,filled", [(90, 90), (90, 60), (90, 1), (41, 30), (40, 33), (12, 12)])
+def test_scanned_length_matches_loaded_clip(train_model, tmp_path, frames, filled):
+    path = recorded_clip(tmp_path / "clip.npy", frames, filled)
+    assert train_model.sampled_length(frames, filled) == train_model.true_length(train_model.load_clip(path))
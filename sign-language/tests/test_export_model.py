@@ -0,0 +1,81 @@
+import os
+import json
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+GRID = dict(batch_sizes=(1, 3), seq_lens=(1, 7, 40))
+
+
+@pytest.fixture
+def scripts(tmp_path, monkeypatch):
+    """Import the training scripts from a scratch cwd (train_model creates models/ on import)."""
+    monkeypatch.chdir(tmp_path)
+    import export_model
+    import train_model
+    import distill_student
+    return export_model, train_model, distill_student
+
+
+@pytest.mark.parametrize("method", ["trace", "script"])
+def test_bilstm_export_matches_eager(scripts, tmp_path, method):
+    export_model, train_model, _ = scripts
+    torch.manual_seed(0)
+    model = train_model.BiLSTMAttn(train_model.INPUT_SIZE, 16, 5)
+    path = str(tmp_path / "bilstm.pt")
+
+    exported = export_model.export_dynamic(model, path, methods=(method,), **GRID)
+
+    assert os.path.exists(path) and not os.path.exists(path + ".tmp")
+    extra = {"export.json": ""}
+    torch.jit.load(path, _extra_files=extra)
+    assert json.loads(extra["export.json"])["feature_layout"] == "handedness"
+    x = torch.randn(2, 12, train_model.INPUT_SIZE)
+    lengths = torch.tensor([12, 4])
+    with torch.no_grad():
+        assert torch.allclose(exported(x, lengths), model(x, lengths), atol=1e-4)
+
+
+@pytest.mark.parametrize("method", ["trace", "script"])
+def test_student_export_matches_eager(scripts, tmp_path, method):
+    export_model, train_model, distill_student = scripts
+    torch.manual_seed(0)
+    model = distill_student.TemporalConvStudent(train_model.INPUT_SIZE, 5, channels=8)
+    path = str(tmp_path / "student.pt")
+
+    export_model.export_dynamic(model, path, methods=(method,), **GRID)
+
+    assert os.path.exists(path)
+
+
+def test_failed_verification_raises_and_keeps_no_file(scripts, tmp_path):
+    export_model, train_model, _ = scripts
+    model = train_model.BiLSTMAttn(train_model.INPUT_SIZE, 16, 5)
+    path = str(tmp_path / "bad.pt")
+
+    with pytest.raises(RuntimeError):
+        export_model.export_dynamic(model, path, tolerance=-1.0, methods=("script",), **GRID)
+    assert not os.path.exists(path) and not os.path.exists(path + ".tmp")
+
+
+@pytest.mark.parametrize("layout", [None, "handedness"])
+def test_reexport_keeps_checkpoint_layout(scripts, tmp_path, layout):
+    export_model, train_model, _ = scripts
+    model = train_model.BiLSTMAttn(train_model.INPUT_SIZE, 16, 5)
+    checkpoint = {'model_state_dict': model.state_dict(), 'class_names': list("abcde")}
+    if layout is not None:
+        checkpoint['feature_layout'] = layout
+    torch.save(checkpoint, tmp_path / "model.pth")
+
+    loaded, _ = train_model.load_checkpoint_model(str(tmp_path / "model.pth"))
+    path = str(tmp_path / "model.pt")
+    export_model.export_dynamic(loaded, path, methods=("script",), feature_layout=loaded.feature_layout, **GRID)
+
+    extra = {"export.json": ""}
+    torch.jit.load(path, _extra_files=extra)
+    # Checkpoints from before the layout was recorded were trained on detection order
+    assert json.loads(extra["export.json"])["feature_layout"] == (layout or "detection")
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import extract_cache
+from extract_cache import ExtractionCache, source_digest
+
+PARAMS = dict(max_num_hands=2, seq_len=40, code="abc")
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"fake video")
+    return str(path)
+
+
+def seq(value=1.0, frames=40):
+    return np.full((frames, 126), value, dtype=np.float32)
+
+
+def bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10 ** 9))
+
+
+def test_hit_after_put(tmp_path, video):
+    cache = ExtractionCache(PARAMS, cache_dir=str(tmp_path / "cache"))
+    assert cache.get(video) is None
+    cache.put(video, seq())
+    assert cache.get(video).tolist() == seq().tolist()
+    report = cache.close()
+    assert (report["hits"], report["misses"]) == (1, 1)
+
+
+def test_changed_params_miss(tmp_path, video):
+    cache_dir = str(tmp_path / "cache")
+    ExtractionCache(PARAMS, cache_dir=cache_dir).put(video, seq())
+    assert ExtractionCache(dict(PARAMS, code="def"), cache_dir=cache_dir).get(video) is None
+    assert ExtractionCache(PARAMS, cache_dir=cache_dir).get(video) is not None
+
+
+def test_source_digest_follows_the_code():
+    def a(x):
+        return x + 1
+
+    def b(x):
+        return x + 2
+
+    assert source_digest(a) == source_digest(a)
+    assert source_digest(a) != source_digest(b)
+
+
+def test_memoized_hash_invalidated_by_mtime_or_size(tmp_path, video, monkeypatch):
+    hashed = []
+    real = extract_cache._sha256_file
+    monkeypatch.setattr(extract_cache, "_sha256_file", lambda path: hashed.append(path) or real(path))
+    cache = ExtractionCache(PARAMS, cache_dir=str(tmp_path / "cache"))
+
+    first = cache.video_hash(video)
+    cache.video_hash(video)
+    assert len(hashed) == 1  # unchanged file: served from the memo
+
+    bump_mtime(video)
+    assert cache.video_hash(video) == first  # same content, rehashed
+    assert len(hashed) == 2
+
+    mtime_ns = os.stat(video).st_mtime_ns
+    with open(video, "ab") as f:
+        f.write(b" and more")
+    os.utime(video, ns=(mtime_ns, mtime_ns))  # size alone changes
+    assert cache.video_hash(video) != first
+    assert len(hashed) == 3
+
+
+def test_put_evicts_least_recently_used(tmp_path):
+    videos = []
+    for i in range(4):
+        path = tmp_path / f"clip{i}.mp4"
+        path.write_bytes(f"video {i}".encode())
+        videos.append(str(path))
+
+    cache = ExtractionCache(PARAMS, cache_dir=str(tmp_path / "cache"))
+    for i, video in enumerate(videos[:3]):
+        cache.put(video, seq())
+        os.utime(cache._entry_path(cache.key(video)), (1000 + i, 1000 + i))
+    size = cache.size_bytes // 3
+    cache.max_bytes = 3 * size
+    cache.get(videos[0])  # oldest entry becomes the most recently used
+
+    cache.put(videos[3], seq())  # 4 entries > max_bytes: evict down to 90%, i.e. 2 entries
+    assert cache.evicted == 2
+    assert cache.size_bytes == 2 * size
+    assert [cache.get(v) is not None for v in videos] == [True, False, False, True]
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+
+def make_tree(clips_per_class):
+    for split in ("train", "test"):
+        for cls in ("hello", "bye"):
+            folder = os.path.join("keypoints_np", split, cls)
+            os.makedirs(folder, exist_ok=True)
+            for old in os.listdir(folder):
+                os.remove(os.path.join(folder, old))
+            for i in range(clips_per_class):
+                np.save(os.path.join(folder, f"{i}.npy"), np.full((20, 126), 0.5, dtype=np.float32))
+
+
+def test_reconversion_drops_stale_shards(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import keypoint_store
+
+    make_tree(clips_per_class=5)
+    keypoint_store.convert(chunk_size=2)
+    assert len(keypoint_store.KeypointStore(split="train").load()[0]) == 10
+
+    make_tree(clips_per_class=1)
+    keypoint_store.convert(chunk_size=2)
+    store = keypoint_store.KeypointStore(split="train")
+    assert len(store.shards) == 1
+    assert len(store.load()[0]) == 2
+    assert sorted(os.listdir("keypoints_q")) == ["meta.json", "test", "train"]
+
+
+def random_clips(seed=0):
+    """(3, 30, 126) MediaPipe-like values with one hand or both missing in some frames."""
+    rng = np.random.default_rng(seed)
+    seqs = rng.uniform(-0.5, 1.5, (3, 30, 2, 21, 3)).astype(np.float32)
+    seqs[0, :10, 0] = 0     # left hand missing
+    seqs[1, 5:, 1] = 0      # right hand missing
+    seqs[2, 20:] = 0        # no hands (trailing padding)
+    return seqs.reshape(3, 30, 126)
+
+
+@pytest.mark.parametrize("fmt, tolerance", [("int16", None), ("float16", 1e-3)])
+def test_round_trip_error_within_scale(fmt, tolerance):
+    import keypoint_store
+    seqs = random_clips()
+    decoded = keypoint_store.decode(*keypoint_store.encode(seqs, fmt), fmt)
+    assert decoded.dtype == np.float32 and decoded.shape == seqs.shape
+    assert np.abs(decoded - seqs).max() <= (tolerance or keypoint_store.SCALE)
+
+
+@pytest.mark.parametrize("fmt", ["int16", "float16"])
+def test_missing_hands_survive_round_trip(fmt):
+    import keypoint_store
+    seqs = random_clips()
+    landmarks, present = keypoint_store.encode(seqs, fmt)
+    assert present[0, :10].tolist() == [2] * 10 and present[1, 5:].tolist() == [1] * 25
+    assert present[2, 20:].tolist() == [0] * 10 and present[2, :20].tolist() == [3] * 20
+
+    decoded = keypoint_store.decode(landmarks, present, fmt).reshape(3, 30, 2, 63)
+    missing = np.abs(seqs.reshape(3, 30, 2, 63)).sum(axis=-1) == 0
+    assert (decoded[missing] == 0).all()
+    assert (np.abs(decoded[~missing]).sum(axis=-1) > 0).all()
+
+
+def test_dataset_reads_the_store_like_the_npy_clips(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.chdir(tmp_path)
+    import keypoint_store
+    import train_model
+
+    rng = np.random.default_rng(0)
+    for cls, n_frames in (("hello", 25), ("bye", 90)):  # 90: a keypoints_record clip, resampled
+        folder = os.path.join("keypoints_np", "train", cls)
+        os.makedirs(folder)
+        for i in range(3):
+            clip = rng.uniform(0, 1, (n_frames, 126)).astype(np.float32)
+            clip[n_frames - 5:] = 0
+            np.save(os.path.join(folder, f"{i}.npy"), clip)
+    keypoint_store.convert(chunk_size=4)
+
+    from_npy = train_model.KeypointDataset("train", store=None)
+    from_store = train_model.KeypointDataset("train", store="keypoints_q")
+    assert from_store.classes == from_npy.classes
+    assert sorted(from_store.lengths) == sorted(from_npy.lengths)
+    by_path = {os.path.normpath(f): from_npy[i] for i, f in enumerate(from_npy.files)}
+    for i, path in enumerate(from_store.files):
+        x, y, length = from_store[i]
+        x_npy, y_npy, length_npy = by_path[os.path.normpath(path)]
+        assert (y, length) == (y_npy, length_npy)
+        assert torch.allclose(x, x_npy, atol=1e-2)  # normalized to each hand's box: a few SCALE steps
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+
+@pytest.fixture
+def scanned(tmp_path, monkeypatch):
+    """keypoints_np/<split>/<class> tree of three clips, scanned into splits/scan.npz."""
+    monkeypatch.chdir(tmp_path)
+    import scan_dataset
+    for split, cls, name in (("train", "hello", "a"), ("train", "hello", "b"), ("test", "bye", "c")):
+        os.makedirs(os.path.join("keypoints_np", split, cls), exist_ok=True)
+        save_clip(os.path.join("keypoints_np", split, cls, name + ".npy"), frames=30)
+    clips, source = scan_dataset.list_clips(["keypoints_np"])
+    scan_dataset.write_scan(scan_dataset.scan(clips, workers=1), source)
+    return scan_dataset
+
+
+def save_clip(path, frames):
+    np.save(path, np.ones((frames, 126), dtype=np.float32))
+
+
+def later(path):
+    """Bump the mtime explicitly; coarse filesystem clocks may not move within a test."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_current_scan_is_used(scanned):
+    columns = scanned.valid_clips("keypoints_np")
+    assert len(columns["path"]) == 3
+    assert columns["true_length"].tolist() == [30, 30, 30]
+
+
+def test_re_extracted_clip_invalidates_scan(scanned):
+    folder = os.path.join("keypoints_np", "train", "hello")
+    clip = os.path.join(folder, "a.npy")
+    scanned.save_clip(clip, np.ones((12, 126), dtype=np.float32))
+    later(clip)
+    later(folder)
+    assert scanned.valid_clips("keypoints_np") is None
+
+
+def test_unchanged_folders_are_not_listed(scanned, monkeypatch):
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(scanned.os, "scandir", lambda d: listed.append(d) or real_scandir(d))
+    folder = os.path.join("keypoints_np", "train", "hello")
+    with open(os.path.join(folder, "notes.txt"), "w") as f:
+        f.write("not a clip")
+    later(folder)
+
+    assert len(scanned.valid_clips("keypoints_np")["path"]) == 3
+    assert listed == [folder]
+
+
+def test_added_clip_invalidates_scan(scanned):
+    folder = os.path.join("keypoints_np", "train", "hello")
+    save_clip(os.path.join(folder, "new.npy"), frames=30)
+    later(folder)
+    assert scanned.valid_clips("keypoints_np") is None
+
+
+def test_removed_clip_invalidates_scan(scanned):
+    os.remove(os.path.join("keypoints_np", "test", "bye", "c.npy"))
+    assert scanned.valid_clips("keypoints_np") is None
+
+
+def test_added_class_folder_invalidates_scan(scanned):
+    os.makedirs(os.path.join("keypoints_np", "train", "thanks"))
+    assert scanned.valid_clips("keypoints_np") is None
+
+
+def test_class_with_only_invalid_clips_keeps_its_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import scan_dataset
+    for cls, shape in (("again", (30, 5)), ("hello", (30, 126))):
+        os.makedirs(os.path.join("keypoints_np", "train", cls))
+        np.save(os.path.join("keypoints_np", "train", cls, "a.npy"), np.ones(shape, dtype=np.float32))
+    clips, source = scan_dataset.list_clips(["keypoints_np"])
+    scan_dataset.write_scan(scan_dataset.scan(clips, workers=1), source)
+
+    columns = scan_dataset.valid_clips("keypoints_np")
+    assert columns["class"].tolist() == ["hello"]
+    assert columns["classes"].tolist() == ["again", "hello"]
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+
+def test_trial_reports_parameter_bytes_and_drops_resume_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import sweep
+
+    torch.manual_seed(0)
+    split = (torch.randn(8, 10, 126), torch.arange(8) % 2, torch.full((8,), 10))
+    monkeypatch.setattr(sweep, "_data", {"train": split, "test": split, "classes": ["a", "b"]})
+    config = dict(hidden=8, lr=1e-3, batch_size=4, dropout=0.3, epochs=1)
+
+    result = sweep.run_trial((0, config, str(tmp_path)))
+
+    assert sorted(f for f in os.listdir(tmp_path) if f.startswith("trial_")) == ["trial_000.pth"]
+    assert result["size_kb"] == round(result["params"] * 4 / 1024, 1)